@@ -14,8 +14,10 @@ from typing import List, Optional
 from dotenv import load_dotenv
 load_dotenv()
 
-# Add the backend directory to Python path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Add the backend directory to Python path (once)
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
 
 from app.services.user_db import user_db
 from app.services.auth_service import auth_service
@@ -3,11 +3,14 @@ Database manager for storing and retrieving market data.
 """
 import os
 import aiosqlite
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import logging
 import asyncio
-from typing import Optional, List, Dict, Any
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Optional, List, Dict, Any, AsyncIterator
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -18,6 +21,9 @@ class DatabaseManager:
         """Initialize database manager."""
         self.db_path = db_path
         self.conn = None
+        # Optional pool of read-only connections for concurrent reads
+        self._read_pool: Optional[asyncio.Queue] = None
+        self._read_connections: List[aiosqlite.Connection] = []
         # Ensure directory exists
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
 
@@ -29,10 +35,67 @@ class DatabaseManager:
 
     async def close(self):
         """Close the database connection."""
+        await self.close_read_pool()
         if self.conn:
             await self.conn.close()
             self.conn = None
 
+    async def open_read_pool(self, size: int = 4, pragmas: Optional[str] = None):
+        """
+        Open a pool of read-only connections
+        
+        Each aiosqlite connection runs its queries on its own thread, so reads
+        through the pool can run concurrently under WAL instead of queueing
+        behind the shared connection.
+        
+        Args:
+            size: Number of read-only connections
+            pragmas: Optional PRAGMA script run on each new connection
+        """
+        if self._read_pool is not None:
+            return
+        
+        uri = Path(os.path.abspath(self.db_path)).as_uri() + "?mode=ro"
+        pool = asyncio.Queue()
+        connections = []
+        try:
+            for _ in range(max(1, size)):
+                conn = await aiosqlite.connect(uri, uri=True)
+                connections.append(conn)
+                if pragmas:
+                    await conn.executescript(pragmas)
+                pool.put_nowait(conn)
+        except Exception:
+            for conn in connections:
+                await conn.close()
+            raise
+        
+        self._read_connections = connections
+        self._read_pool = pool
+        logger.info(f"Opened {len(connections)} read-only database connections")
+
+    async def close_read_pool(self):
+        """Close the read-only connection pool, if open."""
+        connections = self._read_connections
+        self._read_pool = None
+        self._read_connections = []
+        for conn in connections:
+            await conn.close()
+
+    @asynccontextmanager
+    async def read_connection(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a read-only connection from the pool, or the shared connection if no pool is open."""
+        pool = self._read_pool
+        if pool is None:
+            yield self.conn
+            return
+        
+        conn = await pool.get()
+        try:
+            yield conn
+        finally:
+            pool.put_nowait(conn)
+
     async def create_tables(self):
         """Create the candle_data table if it doesn't exist"""
         create_table_sql = """
@@ -130,6 +193,57 @@ class DatabaseManager:
             return int(result[0])
         return None
     
+    async def get_latest_candle_timestamps_many(self, symbols: List[str]) -> Dict[str, int]:
+        """
+        Get the timestamp of the latest candle for several symbols in a single query
+        
+        Args:
+            symbols: Trading symbols
+            
+        Returns:
+            Dictionary mapping symbol to its latest timestamp (ms). Symbols without data are omitted.
+        """
+        if not symbols:
+            return {}
+        
+        # Per-symbol MAX() is answered from the (symbol, timestamp) index without
+        # scanning the symbol's history, which a GROUP BY over all rows would do
+        per_symbol_sql = "SELECT ?, MAX(timestamp) FROM candle_data WHERE symbol = ?"
+        query = " UNION ALL ".join([per_symbol_sql] * len(symbols))
+        params = []
+        for symbol in symbols:
+            params.extend((symbol, symbol))
+        
+        async with self.read_connection() as conn:
+            cursor = await conn.execute(query, params)
+            rows = await cursor.fetchall()
+        return {symbol: int(timestamp) for symbol, timestamp in rows if timestamp is not None}
+    
+    async def count_candles_since_many(self, since: Dict[str, int]) -> Dict[str, int]:
+        """
+        Count each symbol's candles at or after a per-symbol timestamp in a single query
+        
+        Args:
+            since: Dictionary mapping symbol to the earliest timestamp (ms) to count
+            
+        Returns:
+            Dictionary mapping symbol to its candle count
+        """
+        if not since:
+            return {}
+        
+        # Each count is a range scan of the (symbol, timestamp) index, without reading table rows
+        per_symbol_sql = "SELECT ?, COUNT(*) FROM candle_data WHERE symbol = ? AND timestamp >= ?"
+        query = " UNION ALL ".join([per_symbol_sql] * len(since))
+        params = []
+        for symbol, timestamp in since.items():
+            params.extend((symbol, symbol, timestamp))
+        
+        async with self.read_connection() as conn:
+            cursor = await conn.execute(query, params)
+            rows = await cursor.fetchall()
+        return {symbol: int(count) for symbol, count in rows}
+    
     async def get_latest_candles(self, symbol: str, limit: int = 1000) -> pd.DataFrame:
         """Get the latest candles for a symbol"""
         query = """
@@ -157,6 +271,71 @@ class DatabaseManager:
         
         return df
     
+    async def _fetch_latest_candle_rows(self, symbols: List[str], limit: int) -> List[tuple]:
+        """Fetch (symbol, timestamp, open, high, low, close, volume, turnover) rows for several symbols"""
+        if not symbols:
+            return []
+        
+        # One indexed LIMIT subquery per symbol, combined into a single statement.
+        # A ROW_NUMBER() window would have to sort each symbol's full history.
+        per_symbol_sql = """
+        SELECT * FROM (
+            SELECT symbol, timestamp, open, high, low, close, volume, turnover
+            FROM candle_data
+            WHERE symbol = ?
+            ORDER BY timestamp DESC
+            LIMIT ?
+        )
+        """
+        query = " UNION ALL ".join([per_symbol_sql] * len(symbols))
+        params = []
+        for symbol in symbols:
+            params.extend((symbol, limit))
+        
+        async with self.read_connection() as conn:
+            cursor = await conn.execute(query, params)
+            return await cursor.fetchall()
+    
+    async def get_latest_candle_arrays_many(self, symbols: List[str], limit: int = 1000) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Get the latest candles for several symbols as NumPy column arrays in a single query
+        
+        Args:
+            symbols: Trading symbols
+            limit: Maximum number of candles per symbol
+            
+        Returns:
+            Dictionary mapping symbol to a dict of column arrays sorted oldest first:
+            'timestamp' (int64 milliseconds) and float64 'open', 'high', 'low',
+            'close', 'volume', 'turnover'. Symbols without data are omitted.
+        """
+        rows = await self._fetch_latest_candle_rows(symbols, limit)
+        
+        if not rows:
+            return {}
+        
+        # Decode the rows straight into one typed record array instead of
+        # transposing them through per-column Python tuples
+        names = ('open', 'high', 'low', 'close', 'volume', 'turnover')
+        record_dtype = np.dtype(
+            [('symbol', f'U{max(map(len, symbols))}'), ('timestamp', np.int64)]
+            + [(name, np.float64) for name in names]
+        )
+        records = np.fromiter(rows, dtype=record_dtype, count=len(rows))
+        
+        # Group rows by symbol, oldest first within each symbol
+        records = records[np.lexsort((records['timestamp'], records['symbol']))]
+        row_symbols = records['symbol']
+        starts = np.flatnonzero(np.r_[True, row_symbols[1:] != row_symbols[:-1]])
+        ends = np.r_[starts[1:], len(records)]
+        
+        # One contiguous array per column, sliced per symbol without copying
+        columns = {name: np.ascontiguousarray(records[name]) for name in ('timestamp',) + names}
+        candles = {}
+        for start, end in zip(starts, ends):
+            candles[str(row_symbols[start])] = {name: column[start:end] for name, column in columns.items()}
+        return candles
+    
     async def get_candle_range(self, symbol: str, start_timestamp: int, end_timestamp: int, limit: int = 1000) -> pd.DataFrame:
         """Get candles within a timestamp range"""
         query = """
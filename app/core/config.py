@@ -4,11 +4,15 @@ All configuration values are loaded from .env file or environment variables.
 """
 
 import os
+from pathlib import Path
 from typing import Optional
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# The backend's .env; passing it explicitly skips find_dotenv's call-stack and directory walk
+ENV_FILE = Path(__file__).resolve().parents[2] / ".env"
+
+# Load environment variables from .env file (searching for one only if it isn't there)
+load_dotenv(ENV_FILE if ENV_FILE.is_file() else None)
 
 class Config:
     """Centralized configuration class that loads all settings from environment variables."""
@@ -26,6 +30,9 @@ class Config:
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     JWT_EXPIRATION_HOURS: int = int(os.getenv("JWT_EXPIRATION_HOURS", "24"))
     
+    # Password Hashing Configuration (bcrypt cost is calibrated to this budget at startup)
+    BCRYPT_TARGET_MS: int = int(os.getenv("BCRYPT_TARGET_MS", "100"))
+    
     # Gemini AI API Configuration
     GEMINI_API_KEY: Optional[str] = os.getenv("GEMINI_API_KEY")
     
@@ -38,6 +45,9 @@ class Config:
     FULLY_DILUTED_UPDATE_INTERVAL: int = int(os.getenv("FULLY_DILUTED_UPDATE_INTERVAL", "1800"))
     MARKET_ANALYSIS_UPDATE_INTERVAL: int = int(os.getenv("MARKET_ANALYSIS_UPDATE_INTERVAL", "2700"))
     
+    # TrendSpider scan: symbol batches fetched and processed concurrently
+    TRENDSPIDER_SCAN_PARALLELISM: int = int(os.getenv("TRENDSPIDER_SCAN_PARALLELISM", "4"))
+    
     # Logging Configuration
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     
@@ -62,6 +72,10 @@ class Config:
     def market_analysis_update_interval(self) -> int:
         return self.MARKET_ANALYSIS_UPDATE_INTERVAL
     
+    @property
+    def scan_parallelism(self) -> int:
+        return self.TRENDSPIDER_SCAN_PARALLELISM
+    
     @property
     def gemini_api_key(self) -> Optional[str]:
         return self.GEMINI_API_KEY
@@ -0,0 +1,74 @@
+"""app/core/scheduler.py
+Single-task scheduler for periodic background jobs.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Callable, List, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicScheduler:
+    """Run periodic jobs from one asyncio task that sleeps until the next job is due.
+
+    Each job is rescheduled `interval` seconds after its previous run finishes,
+    so a slow run never overlaps with the next one.
+    """
+
+    def __init__(self) -> None:
+        # (due time, tie-breaker, interval, func, run_in_thread)
+        self._heap: List[Tuple[float, int, float, Callable[[], Any], bool]] = []
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._running: Set[asyncio.Task] = set()
+
+    def add(self, interval: float, func: Callable[[], Any], initial_delay: float = 0.0,
+            run_in_thread: bool = False) -> None:
+        """Register a job.
+
+        Args:
+            interval: Seconds between the end of one run and the start of the next
+            func: Coroutine function, or a blocking function if run_in_thread is True
+            initial_delay: Seconds to wait before the first run
+            run_in_thread: Run func in the thread pool instead of awaiting it
+        """
+        self._push(time.monotonic() + initial_delay, interval, func, run_in_thread)
+
+    def _push(self, due: float, interval: float, func: Callable[[], Any], run_in_thread: bool) -> None:
+        heapq.heappush(self._heap, (due, next(self._counter), interval, func, run_in_thread))
+        self._wakeup.set()
+
+    async def _run_job(self, interval: float, func: Callable[[], Any], run_in_thread: bool) -> None:
+        try:
+            if run_in_thread:
+                await run_in_threadpool(func)
+            else:
+                await func()
+        except Exception:
+            logger.exception(f"Periodic job {getattr(func, '__name__', func)} failed")
+        finally:
+            self._push(time.monotonic() + interval, interval, func, run_in_thread)
+
+    async def run(self) -> None:
+        """Dispatch due jobs forever."""
+        while True:
+            now = time.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                _, _, interval, func, run_in_thread = heapq.heappop(self._heap)
+                task = asyncio.create_task(self._run_job(interval, func, run_in_thread))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+            # Sleep until the next job is due, or until a job is (re)scheduled
+            timeout = self._heap[0][0] - now if self._heap else None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
@@ -2,6 +2,7 @@
 TrendSpider API endpoints
 """
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from typing import List, Dict, Any, Optional
 import logging
 
@@ -43,6 +44,44 @@ async def run_scan(request: ScanRequest, _: str = Depends(require_auth)):
         logger.error(f"Error running scan: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/scan/csv")
+async def run_scan_csv(request: ScanRequest, _: str = Depends(require_auth)):
+    """
+    Run an EMA scan and stream the results as a TradingView watchlist CSV
+    
+    Args:
+        request: Scan request parameters
+        
+    Returns:
+        CSV content streamed one symbol per line
+    """
+    try:
+        result = await trendspider_service.run_scan(
+            symbols_list=request.symbols,
+            timeframe=request.timeframe,
+            ema_periods=request.ema_periods,
+            filter_conditions=request.filter_conditions,
+            sort_by=request.sort_by,
+            show_only_matching=request.show_only_matching,
+            batch_size=request.batch_size
+        )
+        if not result.get("success", False):
+            raise HTTPException(status_code=500, detail=result.get("error", "Scan failed"))
+        
+        lines, filename = trendspider_service.stream_scan_results_csv(result)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error exporting scan CSV: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return StreamingResponse(
+        lines,
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.get("/scan/{scan_id}/csv")
 async def get_scan_csv(scan_id: str, _: str = Depends(require_auth)):
     """
@@ -16,6 +16,19 @@ from app.models.ai_assistant import ChatSession, ChatMessage
 
 logger = logging.getLogger(__name__)
 
+# Applied on startup; journal_mode is stored in the database file, so every later
+# connection inherits WAL. Other pragmas only last for the connection that sets them.
+_INIT_PRAGMAS = """
+    PRAGMA journal_mode = WAL;
+"""
+
+# Applied to every connection (each call opens its own). The busy timeout comes
+# from sqlite3.connect's timeout instead; cache and mmap sizing are left at their
+# defaults since a connection is closed after a single call.
+_CONNECTION_PRAGMAS = """
+    PRAGMA synchronous = NORMAL;
+"""
+
 
 class AIAssistantDB:
     """Database service for AI assistant chat system."""
@@ -36,8 +49,9 @@ class AIAssistantDB:
         """Get database connection with proper error handling."""
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = sqlite3.connect(self.db_path, timeout=5.0)
             conn.row_factory = sqlite3.Row  # Enable dict-like access
+            conn.executescript(_CONNECTION_PRAGMAS)
             yield conn
         except Exception as e:
             if conn:
@@ -51,6 +65,9 @@ class AIAssistantDB:
     def _init_database(self):
         """Initialize database tables."""
         with self._get_connection() as conn:
+            # WAL lets readers proceed while a writer is active
+            conn.executescript(_INIT_PRAGMAS)
+            
             # Create chat_sessions table
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS chat_sessions (
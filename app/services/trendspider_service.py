@@ -16,17 +16,19 @@ import json
 import asyncio
 import logging
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from io import StringIO
 
 from ..trendspider import config
 from ..trendspider.modules import (
     get_emas_for_all_symbols,
     matches_filter_conditions,
-    matches_custom_filter_conditions,
+    validate_filter_conditions,
+    partition_results,
     format_results,
     sort_results,
-    format_csv_for_tradingview
+    format_csv_for_tradingview,
+    stream_csv_for_tradingview
 )
 from ..trendspider import symbols
 
@@ -102,6 +104,10 @@ class TrendSpiderService:
             scan_symbols = symbols_list or symbols.symbols
             scan_batch_size = batch_size or config.BATCH_SIZE
             
+            # Fail fast on malformed conditions instead of silently matching nothing
+            if filter_conditions:
+                validate_filter_conditions(filter_conditions)
+            
             # Store original config values to restore later
             original_config = config.export_current_config()
             
@@ -138,18 +144,16 @@ class TrendSpiderService:
             successful_results = [r for r in results if r.get("success", False)]
             failed_results = [r for r in results if not r.get("success", False)]
             
-            # Apply filtering if specified
-            if filter_conditions or config.FILTER_CONDITIONS:
-                filter_to_use = filter_conditions or config.FILTER_CONDITIONS
-                matching_results = []
-                for result in successful_results:
-                    if matches_custom_filter_conditions(result, filter_to_use):
-                        matching_results.append(result)
+            # Evaluate the filter conditions (already applied to config) once,
+            # for both the matching list and the formatted text
+            partitioned = partition_results(results)
+            if config.FILTER_CONDITIONS:
+                matching_results = partitioned[0]
             else:
                 matching_results = successful_results
             
             # Format results for display
-            formatted_text, matching_count, total_count = format_results(results)
+            formatted_text, matching_count, total_count = format_results(results, partitioned=partitioned)
             
             # Restore original config
             config.apply_config(original_config)
@@ -211,6 +215,42 @@ class TrendSpiderService:
             logger.error(f"Error generating CSV: {str(e)}")
             raise
     
+    def stream_scan_results_csv(self, scan_results: Dict[str, Any]) -> Tuple[Iterator[str], str]:
+        """
+        Convert scan results to CSV lines for a streaming response
+        
+        The scan's own filter conditions, sort key and display mode are used.
+        
+        Args:
+            scan_results: Results from run_scan method
+            
+        Returns:
+            Tuple of (iterator of CSV lines, filename)
+        """
+        if not scan_results.get("success", False):
+            raise ValueError("Invalid scan results")
+        
+        results = scan_results.get("results", [])
+        
+        # Filter and sort with the scan's settings; the lines are built lazily afterwards
+        original_config = config.export_current_config()
+        try:
+            config.apply_config({
+                "FILTER_CONDITIONS": scan_results["filter_conditions"],
+                "SORT_BY": scan_results["sort_by"],
+                "SHOW_ONLY_MATCHING": scan_results["show_only_matching"]
+            })
+            lines = stream_csv_for_tradingview(results)
+        finally:
+            config.apply_config(original_config)
+        
+        # Generate filename
+        timestamp = scan_results.get("timestamp", datetime.now().isoformat())
+        timeframe = scan_results.get("timeframe_label", "unknown")
+        filename = f"ema_scan_{timeframe}_{timestamp[:19].replace(':', '-')}.csv"
+        
+        return lines, filename
+    
     def list_configurations(self, user_configs: bool = True) -> List[str]:
         """
         List available configurations
@@ -325,7 +365,7 @@ class TrendSpiderService:
         Returns:
             List of symbol names
         """
-        return symbols.symbols.copy()
+        return list(symbols.symbols)
     
     def get_timeframe_options(self) -> Dict[str, str]:
         """
@@ -387,13 +427,12 @@ class TrendSpiderService:
             else:
                 valid_conditions = ["above", "below", "cross_above", "cross_below"]
                 for period_str, condition in config_data["FILTER_CONDITIONS"].items():
-                    # Check if period is valid
+                    # Check the period and any numeric thresholds
                     try:
-                        period = int(period_str)
-                        if period <= 0:
-                            errors.append(f"Invalid EMA period in filter conditions: {period_str}")
-                    except ValueError:
-                        errors.append(f"Invalid EMA period in filter conditions: {period_str}")
+                        validate_filter_conditions({period_str: condition})
+                    except ValueError as e:
+                        errors.append(str(e))
+                        continue
                     
                     # Check if condition is valid
                     if not (condition in valid_conditions or 
@@ -3,8 +3,10 @@ Database service for user management and authentication.
 """
 
 import sqlite3
+import threading
+import time
 import bcrypt
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Optional, Tuple
 from contextlib import contextmanager
 import logging
@@ -15,12 +17,75 @@ from app.models.user import User, UserCreate, WhitelistEmail
 
 logger = logging.getLogger(__name__)
 
+# Per-connection tuning, applied once when a thread opens its connection
+_CONNECTION_PRAGMAS = """
+    PRAGMA journal_mode = WAL;
+    PRAGMA synchronous = NORMAL;
+    PRAGMA cache_size = -64000;
+    PRAGMA temp_store = MEMORY;
+    PRAGMA mmap_size = 268435456;
+    PRAGMA busy_timeout = 5000;
+"""
+
+# Size of sqlite3's per-connection prepared statement cache
+_STATEMENT_CACHE_SIZE = 512
+
+# Rows pulled per round-trip when streaming larger result sets
+_FETCH_BATCH_SIZE = 1000
+
+# Hot-path queries kept as constants so every call hits the statement cache
+_Q_IS_WHITELISTED = "SELECT 1 FROM email_whitelist WHERE email = ? AND is_active = 1 LIMIT 1"
+_Q_USER_BY_EMAIL = "SELECT * FROM users WHERE email = ? AND is_active = 1 LIMIT 1"
+_Q_USER_BY_ID = "SELECT * FROM users WHERE id = ? AND is_active = 1 LIMIT 1"
+_Q_ACTIVE_WHITELIST = """
+    SELECT id, email, added_by, created_at, is_active FROM email_whitelist
+    WHERE is_active = 1
+    ORDER BY created_at DESC
+"""
+_Q_REGISTRATION_STATUS = """
+    SELECT EXISTS (SELECT 1 FROM email_whitelist WHERE email = ? AND is_active = 1),
+           EXISTS (SELECT 1 FROM users WHERE email = ?)
+"""
+_Q_CREATE_USER = """
+    INSERT INTO users (email, password_hash, full_name, created_at, updated_at)
+    SELECT ?, ?, ?, ?, ?
+    WHERE EXISTS (SELECT 1 FROM email_whitelist WHERE email = ? AND is_active = 1)
+      AND NOT EXISTS (SELECT 1 FROM users WHERE email = ?)
+"""
+
+# Bounds for the calibrated bcrypt cost factor; never drop below the minimum
+# recommended work factor, regardless of how slow the host is
+_BCRYPT_MIN_COST = 10
+_BCRYPT_MAX_COST = 14
+
+# Timestamps are stored as INTEGER milliseconds since the Unix epoch (UTC)
+_EPOCH = datetime(1970, 1, 1)
+_ONE_MS = timedelta(milliseconds=1)
+
+# Converts legacy ISO-8601 text timestamps to epoch milliseconds in place
+_MIGRATE_TIMESTAMPS = """
+    UPDATE {table} SET {column} = CAST(ROUND((julianday({column}) - 2440587.5) * 86400000) AS INTEGER)
+    WHERE typeof({column}) = 'text'
+"""
+
+
+def _utc_now_ms() -> int:
+    """Current UTC time as epoch milliseconds."""
+    return (datetime.utcnow() - _EPOCH) // _ONE_MS
+
+
+def _ms_to_datetime(value: int) -> datetime:
+    """Convert stored epoch milliseconds back to a naive UTC datetime."""
+    return _EPOCH + timedelta(milliseconds=value)
+
 
 class UserDB:
     """Database service for user management."""
     
     def __init__(self, db_path: str = None):
         self.db_path = db_path or config.USER_DB_PATH
+        self._local = threading.local()
+        self._bcrypt_cost = self._calibrate_bcrypt_cost()
         self._ensure_db_directory()
         self._init_database()
     
@@ -30,22 +95,28 @@ class UserDB:
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir, exist_ok=True)
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open and tune a new connection for the calling thread."""
+        conn = sqlite3.connect(self.db_path, cached_statements=_STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        conn.executescript(_CONNECTION_PRAGMAS)
+        return conn
+    
     @contextmanager
     def _get_connection(self):
-        """Get database connection with proper error handling."""
-        conn = None
+        """Get the calling thread's persistent connection with proper error handling."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row  # Enable dict-like access
             yield conn
         except Exception as e:
-            if conn:
+            if conn.in_transaction:
                 conn.rollback()
             logger.error(f"Database error: {e}")
             raise
-        finally:
-            if conn:
-                conn.close()
     
     def _init_database(self):
         """Initialize database tables."""
@@ -58,8 +129,8 @@ class UserDB:
                     password_hash TEXT NOT NULL,
                     full_name TEXT,
                     is_active BOOLEAN DEFAULT 1,
-                    created_at TIMESTAMP NOT NULL,
-                    updated_at TIMESTAMP NOT NULL
+                    created_at INTEGER NOT NULL,
+                    updated_at INTEGER NOT NULL
                 )
             """)
             
@@ -69,7 +140,7 @@ class UserDB:
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     email TEXT UNIQUE NOT NULL,
                     added_by INTEGER,
-                    created_at TIMESTAMP NOT NULL,
+                    created_at INTEGER NOT NULL,
                     is_active BOOLEAN DEFAULT 1,
                     FOREIGN KEY (added_by) REFERENCES users (id)
                 )
@@ -91,52 +162,72 @@ class UserDB:
                 ON email_whitelist (email)
             """)
             
+            # Migrate timestamps written by older versions as ISO text
+            for table, column in (("users", "created_at"), ("users", "updated_at"),
+                                  ("email_whitelist", "created_at")):
+                conn.execute(_MIGRATE_TIMESTAMPS.format(table=table, column=column))
+            
             conn.commit()
     
 
+    def _calibrate_bcrypt_cost(self) -> int:
+        """Pick the highest bcrypt cost whose hash time stays within the configured budget."""
+        target_seconds = config.BCRYPT_TARGET_MS / 1000
+        cost = _BCRYPT_MIN_COST
+        for candidate in range(_BCRYPT_MIN_COST, _BCRYPT_MAX_COST + 1):
+            start = time.perf_counter()
+            bcrypt.hashpw(b'x' * 16, bcrypt.gensalt(candidate))
+            if time.perf_counter() - start > target_seconds:
+                break
+            cost = candidate
+        
+        logger.info(f"Using bcrypt cost factor {cost} (target {config.BCRYPT_TARGET_MS} ms)")
+        return cost
+    
     def _hash_password(self, password: str) -> str:
         """Hash a password using bcrypt."""
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(self._bcrypt_cost)
         return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
     
     def _verify_password(self, password: str, password_hash: str) -> bool:
         """Verify a password against its hash."""
         return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
     
-    def is_email_whitelisted(self, email: str) -> bool:
+    def is_email_whitelisted(self, email: str, _normalized: bool = False) -> bool:
         """Check if an email is in the whitelist."""
+        if not _normalized:
+            email = email.lower()
+        
         with self._get_connection() as conn:
-            row = conn.execute("""
-                SELECT id FROM email_whitelist 
-                WHERE email = ? AND is_active = 1
-            """, (email.lower(),)).fetchone()
+            row = conn.execute(_Q_IS_WHITELISTED, (email,)).fetchone()
             return row is not None
     
     def add_email_to_whitelist(self, email: str, added_by: Optional[int] = None) -> WhitelistEmail:
         """Add an email to the whitelist."""
-        now = datetime.utcnow()
+        email = email.lower()
+        now_ms = _utc_now_ms()
         
         with self._get_connection() as conn:
             # Check if already exists
             existing = conn.execute("""
                 SELECT * FROM email_whitelist WHERE email = ?
-            """, (email.lower(),)).fetchone()
+            """, (email,)).fetchone()
             
             if existing:
                 # Reactivate if inactive
                 if not existing['is_active']:
                     conn.execute("""
                         UPDATE email_whitelist 
-                        SET is_active = 1, updated_at = ?
+                        SET is_active = 1
                         WHERE email = ?
-                    """, (now, email.lower()))
+                    """, (email,))
                     conn.commit()
                 
                 return WhitelistEmail(
                     id=existing['id'],
                     email=existing['email'],
                     added_by=existing['added_by'],
-                    created_at=datetime.fromisoformat(existing['created_at']),
+                    created_at=_ms_to_datetime(existing['created_at']),
                     is_active=True
                 )
             else:
@@ -144,92 +235,115 @@ class UserDB:
                 cursor = conn.execute("""
                     INSERT INTO email_whitelist (email, added_by, created_at)
                     VALUES (?, ?, ?)
-                """, (email.lower(), added_by, now))
+                """, (email, added_by, now_ms))
                 whitelist_id = cursor.lastrowid
                 conn.commit()
                 
                 return WhitelistEmail(
                     id=whitelist_id,
-                    email=email.lower(),
+                    email=email,
                     added_by=added_by,
-                    created_at=now,
+                    created_at=_ms_to_datetime(now_ms),
                     is_active=True
                 )
     
     def remove_email_from_whitelist(self, email: str) -> bool:
         """Remove an email from the whitelist (soft delete)."""
+        email = email.lower()
+        
         with self._get_connection() as conn:
             cursor = conn.execute("""
                 UPDATE email_whitelist 
                 SET is_active = 0
                 WHERE email = ?
-            """, (email.lower(),))
+            """, (email,))
             conn.commit()
             return cursor.rowcount > 0
     
     def get_whitelist_emails(self) -> List[WhitelistEmail]:
         """Get all active whitelist emails."""
         with self._get_connection() as conn:
-            rows = conn.execute("""
-                SELECT * FROM email_whitelist 
-                WHERE is_active = 1
-                ORDER BY created_at DESC
-            """).fetchall()
+            # Plain tuples instead of sqlite3.Row; the connection is shared, so
+            # only this cursor's row factory is changed
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(_Q_ACTIVE_WHITELIST)
             
             emails = []
-            for row in rows:
-                emails.append(WhitelistEmail(
-                    id=row['id'],
-                    email=row['email'],
-                    added_by=row['added_by'],
-                    created_at=datetime.fromisoformat(row['created_at']),
-                    is_active=bool(row['is_active'])
-                ))
+            while True:
+                rows = cursor.fetchmany(_FETCH_BATCH_SIZE)
+                if not rows:
+                    break
+                emails.extend(
+                    WhitelistEmail(
+                        id=row_id,
+                        email=email,
+                        added_by=added_by,
+                        created_at=_ms_to_datetime(created_at),
+                        is_active=bool(is_active)
+                    )
+                    for row_id, email, added_by, created_at, is_active in rows
+                )
             
             return emails
     
     def create_user(self, user_create: UserCreate) -> User:
         """Create a new user."""
-        # Check if email is whitelisted
-        if not self.is_email_whitelisted(user_create.email):
-            raise ValueError("Email is not whitelisted for registration")
+        email = user_create.email.lower()
         
-        # Check if user already exists
-        if self.get_user_by_email(user_create.email):
+        # Cheap indexed checks first, so rejected registrations never pay for a bcrypt hash
+        with self._get_connection() as conn:
+            is_whitelisted, user_exists = conn.execute(_Q_REGISTRATION_STATUS, (email, email)).fetchone()
+        if not is_whitelisted:
+            raise ValueError("Email is not whitelisted for registration")
+        if user_exists:
             raise ValueError("User with this email already exists")
         
-        now = datetime.utcnow()
         password_hash = self._hash_password(user_create.password)
+        now_ms = _utc_now_ms()
         
         with self._get_connection() as conn:
-            cursor = conn.execute("""
-                INSERT INTO users (email, password_hash, full_name, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?)
-            """, (
-                user_create.email.lower(),
+            # The insert re-checks both conditions in case they changed since the check above
+            cursor = conn.execute(_Q_CREATE_USER, (
+                email,
                 password_hash,
                 user_create.full_name,
-                now,
-                now
+                now_ms,
+                now_ms,
+                email,
+                email
             ))
-            user_id = cursor.lastrowid
-            conn.commit()
+            
+            inserted = cursor.rowcount > 0
+            if inserted:
+                user_id = cursor.lastrowid
+                conn.commit()
+            else:
+                conn.rollback()
         
+        if not inserted:
+            # Nothing inserted - find out which precondition failed
+            if not self.is_email_whitelisted(email, _normalized=True):
+                raise ValueError("Email is not whitelisted for registration")
+            raise ValueError("User with this email already exists")
+        
+        now = _ms_to_datetime(now_ms)
         return User(
             id=user_id,
-            email=user_create.email.lower(),
+            email=email,
             full_name=user_create.full_name,
             is_active=True,
             created_at=now,
             updated_at=now
         )
     
-    def get_user_by_email(self, email: str) -> Optional[User]:
+    def get_user_by_email(self, email: str, _normalized: bool = False) -> Optional[User]:
         """Get a user by email."""
+        if not _normalized:
+            email = email.lower()
+        
         with self._get_connection() as conn:
-            row = conn.execute("""
-                SELECT * FROM users WHERE email = ? AND is_active = 1
-            """, (email.lower(),)).fetchone()
+            row = conn.execute(_Q_USER_BY_EMAIL, (email,)).fetchone()
             
             if not row:
                 return None
@@ -239,16 +353,14 @@ class UserDB:
                 email=row['email'],
                 full_name=row['full_name'],
                 is_active=bool(row['is_active']),
-                created_at=datetime.fromisoformat(row['created_at']),
-                updated_at=datetime.fromisoformat(row['updated_at'])
+                created_at=_ms_to_datetime(row['created_at']),
+                updated_at=_ms_to_datetime(row['updated_at'])
             )
     
     def get_user_by_id(self, user_id: int) -> Optional[User]:
         """Get a user by ID."""
         with self._get_connection() as conn:
-            row = conn.execute("""
-                SELECT * FROM users WHERE id = ? AND is_active = 1
-            """, (user_id,)).fetchone()
+            row = conn.execute(_Q_USER_BY_ID, (user_id,)).fetchone()
             
             if not row:
                 return None
@@ -258,16 +370,16 @@ class UserDB:
                 email=row['email'],
                 full_name=row['full_name'],
                 is_active=bool(row['is_active']),
-                created_at=datetime.fromisoformat(row['created_at']),
-                updated_at=datetime.fromisoformat(row['updated_at'])
+                created_at=_ms_to_datetime(row['created_at']),
+                updated_at=_ms_to_datetime(row['updated_at'])
             )
     
     def authenticate_user(self, email: str, password: str) -> Optional[User]:
         """Authenticate a user with email and password."""
+        email = email.lower()
+        
         with self._get_connection() as conn:
-            row = conn.execute("""
-                SELECT * FROM users WHERE email = ? AND is_active = 1
-            """, (email.lower(),)).fetchone()
+            row = conn.execute(_Q_USER_BY_EMAIL, (email,)).fetchone()
             
             if not row:
                 return None
@@ -280,13 +392,13 @@ class UserDB:
                 email=row['email'],
                 full_name=row['full_name'],
                 is_active=bool(row['is_active']),
-                created_at=datetime.fromisoformat(row['created_at']),
-                updated_at=datetime.fromisoformat(row['updated_at'])
+                created_at=_ms_to_datetime(row['created_at']),
+                updated_at=_ms_to_datetime(row['updated_at'])
             )
     
     def update_user(self, user_id: int, full_name: Optional[str] = None, email: Optional[str] = None) -> Optional[User]:
         """Update user information."""
-        now = datetime.utcnow()
+        now_ms = _utc_now_ms()
         
         with self._get_connection() as conn:
             # Build dynamic update query
@@ -298,17 +410,18 @@ class UserDB:
                 params.append(full_name)
             
             if email is not None:
+                email = email.lower()
                 # Check if new email is whitelisted
-                if not self.is_email_whitelisted(email):
+                if not self.is_email_whitelisted(email, _normalized=True):
                     raise ValueError("New email is not whitelisted")
                 updates.append("email = ?")
-                params.append(email.lower())
+                params.append(email)
             
             if not updates:
                 return self.get_user_by_id(user_id)
             
             updates.append("updated_at = ?")
-            params.append(now)
+            params.append(now_ms)
             params.append(user_id)
             
             query = f"UPDATE users SET {', '.join(updates)} WHERE id = ?"
@@ -340,7 +453,7 @@ class UserDB:
                 UPDATE users 
                 SET password_hash = ?, updated_at = ?
                 WHERE id = ?
-            """, (new_password_hash, datetime.utcnow(), user_id))
+            """, (new_password_hash, _utc_now_ms(), user_id))
             conn.commit()
             
             return cursor.rowcount > 0
@@ -352,7 +465,7 @@ class UserDB:
                 UPDATE users 
                 SET is_active = 0, updated_at = ?
                 WHERE id = ?
-            """, (datetime.utcnow(), user_id))
+            """, (_utc_now_ms(), user_id))
             conn.commit()
             return cursor.rowcount > 0
 
@@ -1,8 +1,17 @@
 import os
+import copy
 import json
 import logging
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional
 
+try:
+    import orjson
+except ImportError:  # Optional dependency - fall back to the stdlib parser
+    orjson = None
+
+from app.core.config import config as app_config
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -15,26 +24,63 @@ SORT_BY = "symbol"
 SHOW_ONLY_MATCHING = True
 FORMAT_LARGE_NUMBERS = True
 BATCH_SIZE = 4
+MAX_INFLIGHT_FETCHES = app_config.scan_parallelism  # Symbol batches processed concurrently (TRENDSPIDER_SCAN_PARALLELISM)
 CACHE_RESULTS = False
 CACHE_EXPIRY = 300  # 5 minutes
 
+# EMA warmup fetched beyond the SMA seed window, in multiples k of the largest period
+# (measured in target-timeframe candles). The seed's remaining weight in the latest
+# EMA is (1 - 2/(period+1))^(k*period), roughly e^(-2k): ~13.5% at 1x, ~3.4e-4 at 4x.
+# Keep k >= 4 so values match the exchange/TradingView; the 10000-candle fetch cap
+# can still shorten the warmup for long periods on high timeframes.
+EMA_WARMUP_MULTIPLIER = 4
+
 # Configuration directories
 CONFIG_DIR = os.path.join(os.path.dirname(__file__), "config")
 USER_CONFIG_DIR = os.path.join(os.path.dirname(__file__), "my_configs")
 
+# Parsed config files keyed by (path, mtime_ns); editing a file changes its key
+_CONFIG_CACHE: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_CONFIG_CACHE_SIZE = 32
+
+# Last active config name read from active_config.json, with the file's mtime_ns
+_ACTIVE_CACHE: Dict[str, Any] = {"name": None, "mtime": 0}
+
 # Ensure config directories exist
 if not os.path.exists(CONFIG_DIR):
     os.makedirs(CONFIG_DIR)
 if not os.path.exists(USER_CONFIG_DIR):
     os.makedirs(USER_CONFIG_DIR)
 
+def _read_json(path: str) -> Any:
+    """Read and parse a JSON file, using orjson when available"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def _write_json(path: str, data: Any) -> None:
+    """Serialize data to a JSON file, using orjson when available"""
+    if orjson is not None:
+        # FILTER_CONDITIONS may be keyed by int periods, which orjson rejects by default
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=4)
+
 def get_active_config_name() -> str:
     """Get the name of the active configuration"""
     active_config_path = os.path.join(CONFIG_DIR, "active_config.json")
     try:
-        with open(active_config_path, 'r') as f:
-            active_config = json.load(f)
-            return active_config.get("active_config", "default")
+        mtime = os.stat(active_config_path).st_mtime_ns
+        if _ACTIVE_CACHE["name"] is not None and _ACTIVE_CACHE["mtime"] == mtime:
+            return _ACTIVE_CACHE["name"]
+
+        active_config = _read_json(active_config_path)
+        name = active_config.get("active_config", "default")
+        _ACTIVE_CACHE["name"] = name
+        _ACTIVE_CACHE["mtime"] = mtime
+        return name
     except Exception:
         return "default"
 
@@ -43,14 +89,7 @@ def load_config(config_name: Optional[str] = None, user_config: bool = True) ->
     config_dir = USER_CONFIG_DIR if user_config else CONFIG_DIR
 
     if config_name is None:
-        active_config_path = os.path.join(CONFIG_DIR, "active_config.json")
-        try:
-            with open(active_config_path, 'r') as f:
-                active_config = json.load(f)
-                config_name = active_config.get("active_config", "default")
-        except Exception as e:
-            logger.error(f"Error loading active config: {str(e)}")
-            config_name = "default"
+        config_name = get_active_config_name()
 
     config_path = os.path.join(config_dir, f"{config_name}.json")
     if not os.path.exists(config_path) and user_config:
@@ -61,16 +100,25 @@ def load_config(config_name: Optional[str] = None, user_config: bool = True) ->
         config_path = os.path.join(CONFIG_DIR, "default.json")
 
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-            logger.info(f"Loaded configuration from {config_path}")
-            # Remove schedule keys if they exist in old files
-            config.pop("scheduled_scan_enabled", None)
-            config.pop("scheduled_scan_hour", None)
-            config.pop("scheduled_scan_minute", None)
-            config.pop("scheduled_scan_config", None)
-            config.pop("auto_scan_interval", None) # Also remove auto scan if present
-            return config
+        cache_key = (config_path, os.stat(config_path).st_mtime_ns)
+        cached = _CONFIG_CACHE.get(cache_key)
+        if cached is not None:
+            _CONFIG_CACHE.move_to_end(cache_key)
+            return copy.deepcopy(cached)
+
+        config = _read_json(config_path)
+        logger.info(f"Loaded configuration from {config_path}")
+        # Remove schedule keys if they exist in old files
+        config.pop("scheduled_scan_enabled", None)
+        config.pop("scheduled_scan_hour", None)
+        config.pop("scheduled_scan_minute", None)
+        config.pop("scheduled_scan_config", None)
+        config.pop("auto_scan_interval", None) # Also remove auto scan if present
+
+        _CONFIG_CACHE[cache_key] = copy.deepcopy(config)
+        if len(_CONFIG_CACHE) > _CONFIG_CACHE_SIZE:
+            _CONFIG_CACHE.popitem(last=False)
+        return config
     except Exception as e:
         logger.error(f"Error loading config file {config_path}: {str(e)}")
         return {}
@@ -92,9 +140,8 @@ def save_config(config: Dict[str, Any], config_name: str, user_config: bool = Tr
 
     try:
         config_path = os.path.join(config_dir, f"{config_name}.json")
-        with open(config_path, 'w') as f:
-            json.dump(config_to_save, f, indent=4)
-            logger.info(f"Saved configuration to {config_path}")
+        _write_json(config_path, config_to_save)
+        logger.info(f"Saved configuration to {config_path}")
     except Exception as e:
         logger.error(f"Error saving config file {config_path}: {str(e)}")
 
@@ -120,15 +167,16 @@ def list_configs(user_config: bool = True) -> List[str]:
     config_dir = USER_CONFIG_DIR if user_config else CONFIG_DIR
     
     try:
-        # List user configs first
-        if user_config:
-            files = [f[:-5] for f in os.listdir(config_dir) if f.endswith('.json')]
-            logger.info(f"Found {len(files)} user configs in {config_dir}")
-            
-        # List system configs
-        else:
-            files = [f[:-5] for f in os.listdir(config_dir) if f.endswith('.json') and f != 'active_config.json']
-            logger.info(f"Found {len(files)} system configs in {config_dir}")
+        with os.scandir(config_dir) as entries:
+            # List user configs first
+            if user_config:
+                files = [e.name[:-5] for e in entries if e.name.endswith('.json')]
+                logger.info(f"Found {len(files)} user configs in {config_dir}")
+                
+            # List system configs
+            else:
+                files = [e.name[:-5] for e in entries if e.name.endswith('.json') and e.name != 'active_config.json']
+                logger.info(f"Found {len(files)} system configs in {config_dir}")
             
         return sorted(files)
     except Exception as e:
@@ -139,10 +187,11 @@ def set_active_config(config_name: str) -> bool:
     """Set the active configuration"""
     active_config_path = os.path.join(CONFIG_DIR, "active_config.json")
     try:
-        with open(active_config_path, 'w') as f:
-            json.dump({"active_config": config_name}, f, indent=4)
-            logger.info(f"Set active configuration to {config_name}")
-            return True
+        _write_json(active_config_path, {"active_config": config_name})
+        _ACTIVE_CACHE["name"] = config_name
+        _ACTIVE_CACHE["mtime"] = os.stat(active_config_path).st_mtime_ns
+        logger.info(f"Set active configuration to {config_name}")
+        return True
     except Exception as e:
         logger.error(f"Error setting active config to {config_name}: {str(e)}")
         return False
@@ -154,6 +203,11 @@ def apply_config(config: Dict[str, Any]) -> None:
     global CACHE_RESULTS, CACHE_EXPIRY
     
     try:
+        # Reject malformed filter conditions before anything is applied
+        if "FILTER_CONDITIONS" in config:
+            from .modules.filtering.conditions import validate_filter_conditions
+            validate_filter_conditions(config["FILTER_CONDITIONS"])
+        
         if "TIMEFRAME" in config:
             TIMEFRAME = config["TIMEFRAME"]
             logger.info(f"Applied TIMEFRAME: {TIMEFRAME}")
@@ -4,26 +4,40 @@ Contains refactored components from the main ema.py file for better organization
 """
 
 # Import all the main functions to maintain backward compatibility
-from .data.fetcher import fetch_kline_data_async
-from .data.processor import process_symbol_batch, get_emas_for_all_symbols
-from .calculation.ema import calculate_ema_tradingview, calculate_all_emas
-from .filtering.conditions import matches_filter_conditions, matches_custom_filter_conditions, format_condition_text, filter_and_sort_results
+from .data.fetcher import fetch_kline_data_async, fetch_kline_data_many_async, fetch_candle_arrays_many_async
+from .data.processor import process_symbol_batch, get_emas_for_all_symbols, collect_result_columns
+from .calculation.ema import calculate_ema_tradingview, calculate_all_emas, calculate_latest_emas, warm_up_ema_kernel
+from .filtering.conditions import (
+    matches_filter_conditions, matches_custom_filter_conditions, format_condition_text, filter_and_sort_results,
+    compile_filter_conditions, matches_compiled_conditions, validate_filter_conditions, partition_results
+)
 from .formatting.results import format_results, sort_results
-from .formatting.csv import format_csv_for_tradingview
-from .utils.numbers import format_number
+from .formatting.csv import format_csv_for_tradingview, stream_csv_for_tradingview
+from .utils.numbers import format_number, format_numbers
 
 __all__ = [
     'fetch_kline_data_async',
+    'fetch_kline_data_many_async',
+    'fetch_candle_arrays_many_async',
     'process_symbol_batch', 
     'get_emas_for_all_symbols',
+    'collect_result_columns',
     'calculate_ema_tradingview',
     'calculate_all_emas',
+    'calculate_latest_emas',
+    'warm_up_ema_kernel',
     'matches_filter_conditions',
     'matches_custom_filter_conditions',
     'format_condition_text',
     'filter_and_sort_results',
+    'compile_filter_conditions',
+    'matches_compiled_conditions',
+    'validate_filter_conditions',
+    'partition_results',
     'format_results',
     'sort_results',
     'format_csv_for_tradingview',
-    'format_number'
+    'stream_csv_for_tradingview',
+    'format_number',
+    'format_numbers'
 ] 
\ No newline at end of file
@@ -1,27 +1,37 @@
 import pandas as pd
 import numpy as np
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 import numpy.typing as npt
 
+try:
+    from numba import njit
+except ImportError:  # Optional dependency - fall back to the NumPy closed form
+    njit = None
+
 from ... import config
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
-def calculate_ema_tradingview(df: pd.DataFrame, period: int) -> pd.Series:
+def _close_array(data: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+    """Close prices as a float64 array from a DataFrame or an array of closes"""
+    if isinstance(data, pd.DataFrame):
+        return np.asarray(data['close'].values, dtype=np.float64)
+    return np.asarray(data, dtype=np.float64)
+
+def _ema_from_array(close_prices: np.ndarray, index: pd.Index, period: int) -> pd.Series:
     """
-    Calculate EMA using TradingView's methodology (optimized)
+    Calculate a TradingView-style EMA from a prepared float64 close array
     
     Args:
-        df: DataFrame with OHLC data
+        close_prices: Close prices as a float64 numpy array
+        index: Index for the returned Series
         period: EMA period
         
     Returns:
         Series with EMA values
     """
-    # Use numpy for speed
-    close_prices = np.asarray(df['close'].values, dtype=np.float64)
     alpha = 2 / (period + 1)
     
     # Pre-allocate the output array
@@ -35,14 +45,29 @@ def calculate_ema_tradingview(df: pd.DataFrame, period: int) -> pd.Series:
         ema[i] = alpha * close_prices[i] + (1 - alpha) * ema[i-1]
         
     # Convert back to pandas Series
-    return pd.Series(ema, index=df.index)
+    return pd.Series(ema, index=index)
 
-def calculate_all_emas(df: pd.DataFrame, periods: Optional[List[int]] = None) -> Dict[int, pd.Series]:
+def calculate_ema_tradingview(df: pd.DataFrame, period: int) -> pd.Series:
     """
-    Calculate multiple EMAs for a single dataframe
+    Calculate EMA using TradingView's methodology (optimized)
     
     Args:
         df: DataFrame with OHLC data
+        period: EMA period
+        
+    Returns:
+        Series with EMA values
+    """
+    # Use numpy for speed
+    close_prices = np.asarray(df['close'].values, dtype=np.float64)
+    return _ema_from_array(close_prices, df.index, period)
+
+def calculate_all_emas(df: Union[pd.DataFrame, np.ndarray], periods: Optional[List[int]] = None) -> Dict[int, pd.Series]:
+    """
+    Calculate multiple EMAs for a single dataframe
+    
+    Args:
+        df: DataFrame with OHLC data, or an array of close prices
         periods: List of EMA periods to calculate
         
     Returns:
@@ -55,20 +80,144 @@ def calculate_all_emas(df: pd.DataFrame, periods: Optional[List[int]] = None) ->
     if not periods:
         return {}
         
+    # Convert the close column once and share it across all periods
+    close_prices = _close_array(df)
+    index = df.index if isinstance(df, pd.DataFrame) else pd.RangeIndex(len(close_prices))
+    
     # Calculate each EMA
     emas = {}
     for period in periods:
         try:
             # Skip if we don't have enough data for this period
-            if len(df) < period:
-                logger.warning(f"Not enough data for {period} EMA calculation. Need {period}, have {len(df)}")
+            if len(close_prices) < period:
+                logger.warning(f"Not enough data for {period} EMA calculation. Need {period}, have {len(close_prices)}")
                 continue
                 
             # Calculate EMA
-            ema = calculate_ema_tradingview(df, period)
+            ema = _ema_from_array(close_prices, index, period)
             emas[period] = ema
             
         except Exception as e:
             logger.error(f"Error calculating {period} EMA: {str(e)}")
             
-    return emas 
\ No newline at end of file
+    return emas 
+
+def _latest_ema_from_array(close_prices: np.ndarray, period: int) -> float:
+    """
+    Calculate only the most recent TradingView-style EMA value
+    
+    Unrolls the recurrence ema[i] = alpha * close[i] + (1 - alpha) * ema[i-1]
+    seeded with the SMA of the first `period` closes into a single weighted
+    sum, so the whole series is never materialized.
+    
+    Args:
+        close_prices: Close prices as a float64 numpy array (len >= period)
+        period: EMA period
+        
+    Returns:
+        Latest EMA value
+    """
+    alpha = 2 / (period + 1)
+    decay = 1 - alpha
+    seed = close_prices[:period].mean()
+    
+    steps = len(close_prices) - period
+    if steps == 0:
+        return float(seed)
+    
+    # Weight of close[i] in the final value is alpha * decay**(n-1-i)
+    weights = decay ** np.arange(steps - 1, -1, -1, dtype=np.float64)
+    return float(decay ** steps * seed + alpha * np.dot(weights, close_prices[period:]))
+
+def _latest_emas_loop(close_prices: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """
+    Latest TradingView-style EMA for each period with the plain recurrence
+    
+    Only the running value is kept, so memory is O(len(periods)). Compiled with
+    numba when it is installed; every period must be <= len(close_prices).
+    
+    Args:
+        close_prices: Close prices as a float64 numpy array
+        periods: EMA periods as an int64 numpy array
+        
+    Returns:
+        Array with the latest EMA value for each period
+    """
+    out = np.empty(periods.size)
+    for j in range(periods.size):
+        period = periods[j]
+        alpha = 2.0 / (period + 1)
+        
+        # SMA seed, then ema = alpha * close + (1 - alpha) * ema
+        total = 0.0
+        for i in range(period):
+            total += close_prices[i]
+        ema = total / period
+        for i in range(period, close_prices.size):
+            ema = alpha * close_prices[i] + (1 - alpha) * ema
+        out[j] = ema
+    return out
+
+# nogil lets concurrent scans run the kernel on separate threads
+_latest_emas_jit = njit(cache=True, nogil=True)(_latest_emas_loop) if njit is not None else None
+
+def warm_up_ema_kernel() -> None:
+    """
+    Compile (or load from the on-disk cache) the numba EMA kernel ahead of the first scan
+    
+    Blocks for several seconds on a cold cache, so call it off the event loop.
+    Does nothing when numba is not installed.
+    """
+    if _latest_emas_jit is None:
+        return
+    try:
+        _latest_emas_jit(np.zeros(2, dtype=np.float64), np.ones(1, dtype=np.int64))
+    except Exception as e:
+        logger.error(f"Error compiling EMA kernel, scans will use the NumPy fallback: {str(e)}")
+
+def calculate_latest_emas(df: Union[pd.DataFrame, np.ndarray], periods: Optional[List[int]] = None) -> Dict[int, float]:
+    """
+    Calculate the latest value of multiple EMAs for a single dataframe
+    
+    Args:
+        df: DataFrame with OHLC data, or an array of close prices
+        periods: List of EMA periods to calculate
+        
+    Returns:
+        Dictionary mapping period to the most recent EMA value
+    """
+    # Use default periods if none provided
+    if periods is None:
+        periods = config.EMA_PERIODS
+        
+    if not periods:
+        return {}
+        
+    # Convert the close column once and share it across all periods
+    close_prices = _close_array(df)
+    
+    # Skip periods we don't have enough data for
+    valid_periods = []
+    for period in periods:
+        if len(close_prices) < period:
+            logger.warning(f"Not enough data for {period} EMA calculation. Need {period}, have {len(close_prices)}")
+        else:
+            valid_periods.append(period)
+    
+    # All periods in one compiled call when numba is available
+    if _latest_emas_jit is not None and valid_periods:
+        try:
+            values = _latest_emas_jit(close_prices, np.asarray(valid_periods, dtype=np.int64))
+            return {period: float(value) for period, value in zip(valid_periods, values)}
+        except Exception as e:
+            logger.error(f"Error in compiled EMA kernel, using NumPy fallback: {str(e)}")
+    
+    # Calculate each EMA
+    emas = {}
+    for period in valid_periods:
+        try:
+            emas[period] = _latest_ema_from_array(close_prices, period)
+        except Exception as e:
+            logger.error(f"Error calculating {period} EMA: {str(e)}")
+            
+    return emas
@@ -1,10 +1,12 @@
 import os
 import sys
+import asyncio
+import numpy as np
 import pandas as pd
 import logging
 import time
 from datetime import datetime
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
 from app.core.config import config as app_config
 from ... import config
@@ -15,9 +17,39 @@ logger = logging.getLogger(__name__)
 # Database manager will be initialized lazily
 db_manager = None
 
+# Serializes the first connect so concurrent scans don't open two connections
+_connect_lock = asyncio.Lock()
+
+# Read-path tuning applied once when the shared connection is opened
+_CONNECTION_PRAGMAS = """
+PRAGMA journal_mode = WAL;
+PRAGMA synchronous = NORMAL;
+PRAGMA temp_store = MEMORY;
+PRAGMA cache_size = -131072;
+PRAGMA mmap_size = 268435456;
+"""
+
+# Per-connection tuning for the read-only pool (journal mode is set by the writer)
+_READ_POOL_PRAGMAS = """
+PRAGMA temp_store = MEMORY;
+PRAGMA cache_size = -32768;
+PRAGMA mmap_size = 268435456;
+"""
+
+# Candle arrays per symbol: symbol -> (latest timestamp, fetch limit, column arrays).
+# Stored candles are never rewritten (INSERT OR IGNORE), so an entry stays valid
+# until the symbol's latest timestamp moves or a backfill adds rows to its window.
+_candle_cache: Dict[str, Tuple[int, int, Dict[str, np.ndarray]]] = {}
+_CANDLE_CACHE_MAX_SYMBOLS = 1024
+
 # Timeframe conversion constants
 DATABASE_TIMEFRAME_MINUTES = 15  # Database stores 15-minute candles
 
+# Columns aggregated when resampling, in the order used by the NumPy path
+_OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'turnover']
+_MS_PER_MINUTE = 60 * 1000
+_MS_PER_DAY = 1440 * _MS_PER_MINUTE
+
 def get_db_manager():
     """Get or initialize the database manager"""
     global db_manager
@@ -38,6 +70,24 @@ def get_db_manager():
     
     return db_manager
 
+async def get_connected_db_manager():
+    """Get the database manager, connecting and tuning it on first use"""
+    db_mgr = get_db_manager()
+    if db_mgr.conn is None:
+        async with _connect_lock:
+            # Re-check: another task may have connected while we waited
+            if db_mgr.conn is None:
+                await db_mgr.connect()
+                await db_mgr.conn.executescript(_CONNECTION_PRAGMAS)
+                logger.info("Connected to candle database with WAL and read-path pragmas")
+                
+                # One reader per in-flight batch; fall back to the shared connection on failure
+                try:
+                    await db_mgr.open_read_pool(config.MAX_INFLIGHT_FETCHES, _READ_POOL_PRAGMAS)
+                except Exception as e:
+                    logger.warning(f"Could not open read-only candle connections, using shared connection: {str(e)}")
+    return db_mgr
+
 def convert_timeframe_to_minutes(interval: str) -> int:
     """Convert timeframe string to minutes"""
     timeframe_map = {
@@ -46,111 +96,180 @@ def convert_timeframe_to_minutes(interval: str) -> int:
     }
     return timeframe_map.get(interval, 240)  # Default to 4H if unknown
 
-def resample_candles_to_timeframe(df: pd.DataFrame, target_timeframe_minutes: int) -> pd.DataFrame:
+def _bucket_reduce(timestamps: np.ndarray, values: np.ndarray, freq: int, day: int) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Resample 15-minute candles to target timeframe
+    Aggregate sorted OHLCV rows into fixed-size time buckets
+    
+    Buckets match pandas resample: they are anchored to midnight of the first
+    row's day, labelled by their start time, and empty buckets are skipped.
     
     Args:
-        df: DataFrame with 15-minute candles
+        timestamps: Sorted integer timestamps
+        values: Float array of shape (n, 6) in _OHLCV_COLUMNS order
+        freq: Bucket size in timestamp units
+        day: One day in timestamp units
+        
+    Returns:
+        Tuple of (bucket start timestamps, aggregated values of shape (buckets, 6))
+    """
+    # Bucket id of every row; rows of one bucket are contiguous
+    origin = timestamps[0] - timestamps[0] % day
+    buckets = (timestamps - origin) // freq
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(timestamps)] - 1
+    
+    out = np.empty((len(starts), len(_OHLCV_COLUMNS)), dtype=np.float64)
+    out[:, 0] = values[starts, 0]
+    out[:, 1] = np.maximum.reduceat(values[:, 1], starts)
+    out[:, 2] = np.minimum.reduceat(values[:, 2], starts)
+    out[:, 3] = values[ends, 3]
+    out[:, 4] = np.add.reduceat(values[:, 4], starts)
+    out[:, 5] = np.add.reduceat(values[:, 5], starts)
+    return origin + buckets[starts] * freq, out
+
+def resample_candle_arrays(candles: Dict[str, np.ndarray], target_timeframe_minutes: int) -> Dict[str, np.ndarray]:
+    """
+    Resample 15-minute candle column arrays to the target timeframe
+    
+    Args:
+        candles: Column arrays sorted oldest first ('timestamp' in milliseconds)
         target_timeframe_minutes: Target timeframe in minutes
         
     Returns:
-        DataFrame resampled to target timeframe
+        Column arrays resampled to target timeframe
     """
-    if target_timeframe_minutes == DATABASE_TIMEFRAME_MINUTES:
-        return df  # No resampling needed
+    if target_timeframe_minutes == DATABASE_TIMEFRAME_MINUTES or len(candles['timestamp']) == 0:
+        return candles
+    
+    values = np.column_stack([candles[column] for column in _OHLCV_COLUMNS])
+    bucket_ts, out = _bucket_reduce(
+        candles['timestamp'], values, target_timeframe_minutes * _MS_PER_MINUTE, _MS_PER_DAY
+    )
     
-    # Set timestamp as index for resampling
-    df_copy = df.copy()
-    df_copy.set_index('timestamp', inplace=True)
+    # Candle columns are NOT NULL in the database, so there is nothing to drop
+    resampled = {'timestamp': bucket_ts}
+    for i, column in enumerate(_OHLCV_COLUMNS):
+        resampled[column] = out[:, i]
+    return resampled
+
+def candle_arrays_to_dataframe(candles: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Build a candle DataFrame (datetime 'timestamp' column) from column arrays"""
+    df = pd.DataFrame({column: candles[column] for column in _OHLCV_COLUMNS})
+    df.insert(0, 'timestamp', pd.to_datetime(candles['timestamp'], unit='ms'))
+    return df
+
+def _candle_limit(requested_timeframe_minutes: int, max_period: Optional[int]) -> int:
+    """Number of 15-minute database candles to fetch for the requested timeframe and EMA period"""
+    limit = 1000  # Default increased from 500
+    if max_period:
+        # Calculate how many 15m candles we need for the target timeframe
+        candles_per_period = max(1, requested_timeframe_minutes // DATABASE_TIMEFRAME_MINUTES)
+        # Need max_period target candles for the SMA seed plus the configured warmup
+        required_candles = max_period + max_period * config.EMA_WARMUP_MULTIPLIER
+        limit = min(10000, max(200, required_candles * candles_per_period))
+    return limit
+
+async def _get_candle_arrays_cached(db_mgr, symbols: List[str], limit: int) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Get the latest candle arrays for several symbols, reusing cached arrays
+    for symbols whose latest candle and window row count have not changed
     
-    # Calculate resampling frequency
-    freq = f'{target_timeframe_minutes}min'
+    Args:
+        db_mgr: Connected database manager
+        symbols: Trading symbols
+        limit: Maximum number of candles per symbol
+        
+    Returns:
+        Dictionary mapping symbol to column arrays. Symbols without data are omitted.
+    """
+    latest_timestamps = await db_mgr.get_latest_candle_timestamps_many(symbols)
     
-    # Resample OHLCV data (removed ema_3200 reference)
-    resampled = df_copy.resample(freq).agg({
-        'open': 'first',
-        'high': 'max',
-        'low': 'min', 
-        'close': 'last',
-        'volume': 'sum',
-        'turnover': 'sum'
-    }).dropna()
+    candles = {}
+    candidates = {}
+    stale = []
+    for symbol, latest_timestamp in latest_timestamps.items():
+        cached = _candle_cache.get(symbol)
+        if cached is not None and cached[0] == latest_timestamp and cached[1] >= limit:
+            candidates[symbol] = cached
+        else:
+            stale.append(symbol)
     
-    # Reset index to make timestamp a column again
-    resampled.reset_index(inplace=True)
+    # Gap-filling backfills insert older candles without moving the latest timestamp,
+    # so a hit also needs the cached window to still hold the same number of rows
+    if candidates:
+        since = {}
+        for symbol, (_, cached_limit, arrays) in candidates.items():
+            timestamps = arrays['timestamp']
+            # A history shorter than the limit was read in full, so count all of it
+            since[symbol] = int(timestamps[0]) if len(timestamps) >= cached_limit else 0
+        counts = await db_mgr.count_candles_since_many(since)
+        for symbol, (_, _, arrays) in candidates.items():
+            if counts.get(symbol) == len(arrays['timestamp']):
+                candles[symbol] = {column: array[-limit:] for column, array in arrays.items()}
+            else:
+                stale.append(symbol)
     
-    logger.debug(f"Resampled {len(df)} 15m candles to {len(resampled)} {target_timeframe_minutes}m candles")
+    if stale:
+        fetched = await db_mgr.get_latest_candle_arrays_many(stale, limit)
+        for symbol, arrays in fetched.items():
+            # Cached arrays are shared between scans, so keep them read-only
+            for array in arrays.values():
+                array.flags.writeable = False
+            _candle_cache.pop(symbol, None)
+            _candle_cache[symbol] = (int(arrays['timestamp'][-1]), limit, arrays)
+            candles[symbol] = arrays
+        
+        # Evict the least recently refreshed symbols
+        while len(_candle_cache) > _CANDLE_CACHE_MAX_SYMBOLS:
+            del _candle_cache[next(iter(_candle_cache))]
     
-    return resampled
+    logger.debug(f"Candle cache: {len(candles) - len(stale)} hits, {len(stale)} misses")
+    return candles
 
-async def fetch_kline_data_async(session=None, symbol: str = "", interval: str = "240", max_period: Optional[int] = None) -> Tuple[Dict[str, Any], Optional[pd.DataFrame]]:
+def _error_result(symbol: str, error: str) -> Dict[str, Any]:
+    """Build the result dictionary for a symbol that could not be processed"""
+    return {
+        "symbol": symbol,
+        "success": False,
+        "error": error,
+        "timestamp": datetime.now().isoformat()
+    }
+
+def build_symbol_result(symbol: str, candles_15m: Optional[Dict[str, np.ndarray]], interval: str) -> Tuple[Dict[str, Any], Optional[Dict[str, np.ndarray]]]:
     """
-    Fetch kline data from local database for a symbol with timeframe conversion
+    Resample fetched 15-minute candles and build the symbol result
     
     Args:
-        session: Unused parameter (kept for compatibility)
         symbol: Trading symbol (e.g., 'BTCUSDT')
+        candles_15m: 15-minute candle column arrays (None if none were found)
         interval: Timeframe interval in minutes or timeframe code
-        max_period: Maximum EMA period to calculate (determines how many candles to fetch)
         
     Returns:
-        Tuple of (Dictionary with symbol data and EMA calculations, DataFrame with candle data or None)
+        Tuple of (Dictionary with symbol data, candle column arrays or None)
     """
     try:
         # Convert interval to minutes
         requested_timeframe_minutes = convert_timeframe_to_minutes(interval)
         
-        # Determine how many database candles to fetch
-        limit = 1000  # Default increased from 500
-        if max_period:
-            # Calculate how many 15m candles we need for the target timeframe
-            candles_per_period = requested_timeframe_minutes // DATABASE_TIMEFRAME_MINUTES
-            # Need enough 15m candles to create max_period candles in target timeframe
-            required_15m_candles = max_period * candles_per_period
-            # Add buffer for EMA calculation warmup
-            limit = min(10000, max(1000, required_15m_candles * 2))
-            
-        start_time = time.time()
-        
-        # Get database manager and fetch 15-minute data
-        db_mgr = get_db_manager()
-        
-        # Connect to database if not already connected
-        if db_mgr.conn is None:
-            await db_mgr.connect()
-            
-        df_15m = await db_mgr.get_latest_candles(symbol, limit)
-        
         # Check if we have data
-        if df_15m.empty:
+        if candles_15m is None or len(candles_15m['close']) == 0:
             logger.warning(f"No candle data found in database for {symbol}")
-            return {
-                "symbol": symbol, 
-                "success": False,
-                "error": "No data available in database",
-                "timestamp": datetime.now().isoformat()
-            }, None
+            return _error_result(symbol, "No data available in database"), None
         
         # Resample to target timeframe if needed
-        if requested_timeframe_minutes != DATABASE_TIMEFRAME_MINUTES:
-            df = resample_candles_to_timeframe(df_15m, requested_timeframe_minutes)
-        else:
-            df = df_15m
+        candles = resample_candle_arrays(candles_15m, requested_timeframe_minutes)
+        candle_count = len(candles['close'])
         
         # Check if we still have data after resampling
-        if df.empty:
+        if candle_count == 0:
             logger.warning(f"No data available after resampling to {requested_timeframe_minutes}m for {symbol}")
-            return {
-                "symbol": symbol, 
-                "success": False,
-                "error": f"No data available after resampling to {requested_timeframe_minutes}m timeframe",
-                "timestamp": datetime.now().isoformat()
-            }, None
+            return _error_result(
+                symbol, f"No data available after resampling to {requested_timeframe_minutes}m timeframe"
+            ), None
         
         # Get current price from the most recent candle
-        current_price = float(df["close"].iloc[-1])
-        current_volume = float(df["volume"].sum())  # Total volume in the period
+        current_price = float(candles['close'][-1])
+        current_volume = float(candles['volume'].sum())  # Total volume in the period
         
         # Basic info about the symbol
         result = {
@@ -163,21 +282,77 @@ async def fetch_kline_data_async(session=None, symbol: str = "", interval: str =
             "timestamp": datetime.now().isoformat(),
             "timeframe": interval,
             "actual_timeframe_minutes": requested_timeframe_minutes,
-            "candles_available": len(df)
+            "candles_available": candle_count
         }
         
+        logger.debug(f"Prepared {symbol} ({len(candles_15m['close'])} 15m candles -> {candle_count} {requested_timeframe_minutes}m candles)")
+        
+        return result, candles
+            
+    except Exception as e:
+        logger.error(f"Error processing candle data for {symbol}: {str(e)}")
+        return _error_result(symbol, str(e)), None
+
+async def fetch_candle_arrays_many_async(symbols: List[str], interval: str = "240", max_period: Optional[int] = None) -> List[Tuple[Dict[str, Any], Optional[Dict[str, np.ndarray]]]]:
+    """
+    Fetch candles for several symbols with a single database query, as column arrays
+    
+    Args:
+        symbols: Trading symbols
+        interval: Timeframe interval in minutes or timeframe code
+        max_period: Maximum EMA period to calculate (determines how many candles to fetch)
+        
+    Returns:
+        List of (result dictionary, candle column arrays or None) tuples in the order of `symbols`
+    """
+    try:
+        limit = _candle_limit(convert_timeframe_to_minutes(interval), max_period)
+        start_time = time.time()
+        
+        # Get connected database manager and fetch 15-minute data
+        db_mgr = await get_connected_db_manager()
+        candles_by_symbol = await _get_candle_arrays_cached(db_mgr, symbols, limit)
+        
         # Log processing time
         fetch_time = time.time() - start_time
-        logger.debug(f"Fetched {symbol} from database in {fetch_time:.2f}s "
-                    f"({len(df_15m)} 15m candles -> {len(df)} {requested_timeframe_minutes}m candles)")
+        logger.debug(f"Fetched {len(candles_by_symbol)}/{len(symbols)} symbols from database in {fetch_time:.2f}s")
         
-        return result, df
-            
     except Exception as e:
-        logger.error(f"Error fetching data from database for {symbol}: {str(e)}")
-        return {
-            "symbol": symbol,
-            "success": False,
-            "error": str(e),
-            "timestamp": datetime.now().isoformat()
-        }, None 
\ No newline at end of file
+        logger.error(f"Error fetching data from database for {len(symbols)} symbols: {str(e)}")
+        return [(_error_result(symbol, str(e)), None) for symbol in symbols]
+    
+    return [build_symbol_result(symbol, candles_by_symbol.get(symbol), interval) for symbol in symbols]
+
+async def fetch_kline_data_many_async(symbols: List[str], interval: str = "240", max_period: Optional[int] = None) -> List[Tuple[Dict[str, Any], Optional[pd.DataFrame]]]:
+    """
+    Fetch kline data for several symbols with a single database query
+    
+    Args:
+        symbols: Trading symbols
+        interval: Timeframe interval in minutes or timeframe code
+        max_period: Maximum EMA period to calculate (determines how many candles to fetch)
+        
+    Returns:
+        List of (result dictionary, DataFrame or None) tuples in the order of `symbols`
+    """
+    results = await fetch_candle_arrays_many_async(symbols, interval, max_period)
+    return [
+        (result, candle_arrays_to_dataframe(candles) if candles is not None else None)
+        for result, candles in results
+    ]
+
+async def fetch_kline_data_async(session=None, symbol: str = "", interval: str = "240", max_period: Optional[int] = None) -> Tuple[Dict[str, Any], Optional[pd.DataFrame]]:
+    """
+    Fetch kline data from local database for a symbol with timeframe conversion
+    
+    Args:
+        session: Unused parameter (kept for compatibility)
+        symbol: Trading symbol (e.g., 'BTCUSDT')
+        interval: Timeframe interval in minutes or timeframe code
+        max_period: Maximum EMA period to calculate (determines how many candles to fetch)
+        
+    Returns:
+        Tuple of (Dictionary with symbol data and EMA calculations, DataFrame with candle data or None)
+    """
+    results = await fetch_kline_data_many_async([symbol], interval, max_period)
+    return results[0]
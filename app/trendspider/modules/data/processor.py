@@ -1,19 +1,20 @@
 import asyncio
+import numpy as np
 import pandas as pd
 import logging
 from typing import Dict, List, Any, Optional, Sequence
 
 from ... import config
 from ... import symbols
-from .fetcher import fetch_kline_data_async, convert_timeframe_to_minutes
-from ..calculation.ema import calculate_all_emas
+from .fetcher import fetch_candle_arrays_many_async, convert_timeframe_to_minutes
+from ..calculation.ema import calculate_latest_emas
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
 async def process_symbol_batch(symbols: List[str], interval: str = "240", periods: Optional[List[int]] = None) -> List[Dict[str, Any]]:
     """
-    Process a batch of symbols concurrently with timeframe conversion
+    Process a batch of symbols with timeframe conversion
     
     Args:
         symbols: List of trading symbols
@@ -33,20 +34,14 @@ async def process_symbol_batch(symbols: List[str], interval: str = "240", period
     # Convert interval to minutes for logging
     requested_timeframe_minutes = convert_timeframe_to_minutes(interval)
     
-    # Create tasks for each symbol
-    tasks = []
-    for symbol in symbols:
-        task = fetch_kline_data_async(None, symbol, interval, max_period)
-        tasks.append(task)
-        
-    # Gather results
-    results = await asyncio.gather(*tasks)
+    # Fetch candles for the whole batch in a single database round-trip
+    results = await fetch_candle_arrays_many_async(symbols, interval, max_period)
     
     # Process each result to calculate EMAs and percentages
     processed_results = []
     
     for result_tuple in results:
-        result, df = result_tuple
+        result, candles = result_tuple
         
         # Skip if there was an error fetching data
         if not result.get("success", False):
@@ -63,39 +58,44 @@ async def process_symbol_batch(symbols: List[str], interval: str = "240", period
             # Get current price
             current_price = result["price"]
             
-            # Skip if no DataFrame was returned (shouldn't happen if success=True, but safety check)
-            if df is None or df.empty:
+            # Skip if no candles were returned (shouldn't happen if success=True, but safety check)
+            if candles is None or len(candles["close"]) == 0:
                 logger.warning(f"No data available for EMA calculation for {symbol}")
                 result["success"] = False
                 result["error"] = "No candle data available for EMA calculation"
                 processed_results.append(result)
                 continue
             
+            close_prices = candles["close"]
+            
             # Check if we have enough data for the largest EMA period
-            if len(df) < max_period:
+            if len(close_prices) < max_period:
                 logger.warning(f"Insufficient data for {max_period}-period EMA calculation for {symbol}. "
-                             f"Have {len(df)} candles, need {max_period}")
+                             f"Have {len(close_prices)} candles, need {max_period}")
                 # We'll still try to calculate what we can
+            elif len(close_prices) < max_period * (1 + config.EMA_WARMUP_MULTIPLIER):
+                logger.debug(f"Short EMA warmup for {symbol}: {len(close_prices)} candles, "
+                             f"want {max_period * (1 + config.EMA_WARMUP_MULTIPLIER)}")
             
-            # Calculate all EMAs at once
-            emas_dict = calculate_all_emas(df, periods)
+            # Calculate the latest value of every EMA in one pass over the closes
+            latest_emas = calculate_latest_emas(close_prices, periods)
             
             # Process each requested EMA period
             for period in periods:
-                if period not in emas_dict:
+                if period not in latest_emas:
                     logger.warning(f"Could not calculate {period}-period EMA for {symbol}")
                     continue
                 
                 # Get the most recent EMA value
-                latest_ema = float(emas_dict[period].iloc[-1])
+                latest_ema = latest_emas[period]
                 logger.debug(f"Calculated {period}-period EMA for {symbol}: {latest_ema}")
                 
                 # Calculate percentage difference
                 percent_diff = ((current_price - latest_ema) / latest_ema) * 100
                 
                 # Store in result
-                result["emas"][str(period)] = latest_ema
-                result["percent_from_ema"][str(period)] = percent_diff
+                result["emas"][period] = latest_ema
+                result["percent_from_ema"][period] = percent_diff
                 
             # Add to processed results
             processed_results.append(result)
@@ -108,6 +108,47 @@ async def process_symbol_batch(symbols: List[str], interval: str = "240", period
             
     return processed_results
 
+def collect_result_columns(results: List[Dict[str, Any]], periods: Sequence[int]) -> Dict[str, np.ndarray]:
+    """
+    Collect processed results into column arrays in a single pass
+    
+    Args:
+        results: List of processed symbol data dictionaries
+        periods: EMA periods to collect
+        
+    Returns:
+        Dictionary of equal-length arrays, one row per result:
+        'symbol', 'valid' (success with at least one EMA), 'price', 'volume',
+        and 'ema_<period>' / 'percent_<period>' for each period.
+        Missing values are NaN.
+    """
+    count = len(results)
+    columns = {
+        "symbol": np.empty(count, dtype=object),
+        "valid": np.zeros(count, dtype=bool),
+        "price": np.full(count, np.nan),
+        "volume": np.full(count, np.nan),
+    }
+    for period in periods:
+        columns[f"ema_{period}"] = np.full(count, np.nan)
+        columns[f"percent_{period}"] = np.full(count, np.nan)
+    
+    for i, data in enumerate(results):
+        columns["symbol"][i] = data.get("symbol")
+        emas = data.get("emas")
+        if not (data.get("success", False) and emas):
+            continue
+        columns["valid"][i] = True
+        columns["price"][i] = data["price"]
+        columns["volume"][i] = data.get("volume", np.nan)
+        percent_from_ema = data["percent_from_ema"]
+        for period in periods:
+            if period in emas and period in percent_from_ema:
+                columns[f"ema_{period}"][i] = emas[period]
+                columns[f"percent_{period}"][i] = percent_from_ema[period]
+    
+    return columns
+
 async def get_emas_for_all_symbols(symbols_list: Optional[List[str]] = None, interval: str = "240", 
                                   periods: Optional[List[int]] = None, batch_size: int = 4) -> List[Dict[str, Any]]:
     """
@@ -139,19 +180,27 @@ async def get_emas_for_all_symbols(symbols_list: Optional[List[str]] = None, int
     logger.info(f"Processing {len(symbols_list)} symbols for {requested_timeframe_minutes}m timeframe, "
                f"EMA periods: {periods}")
         
-    # Process in batches
-    all_results = []
+    # Process in batches, with a bounded number in flight at once
     total_symbols = len(symbols_list)
+    total_batches = (total_symbols + batch_size - 1) // batch_size
+    semaphore = asyncio.Semaphore(max(1, config.MAX_INFLIGHT_FETCHES))
     
-    for i in range(0, total_symbols, batch_size):
-        # Get batch of symbols
-        batch = symbols_list[i:i+batch_size]
-        
-        # Log progress
-        logger.info(f"Processing batch {i//batch_size + 1}/{(total_symbols+batch_size-1)//batch_size} ({len(batch)} symbols)")
-        
-        # Process batch
-        batch_results = await process_symbol_batch(batch, interval, periods)
-        all_results.extend(batch_results)
+    async def _process_batch(batch_number: int, batch: List[str]) -> List[Dict[str, Any]]:
+        async with semaphore:
+            # Log progress
+            logger.info(f"Processing batch {batch_number}/{total_batches} ({len(batch)} symbols)")
+            return await process_symbol_batch(batch, interval, periods)
+    
+    # TaskGroup cancels the remaining batches if one fails unexpectedly
+    async with asyncio.TaskGroup() as tg:
+        tasks = [
+            tg.create_task(_process_batch(i // batch_size + 1, symbols_list[i:i+batch_size]))
+            for i in range(0, total_symbols, batch_size)
+        ]
+    
+    # Keep results in symbol order
+    all_results = []
+    for task in tasks:
+        all_results.extend(task.result())
         
     return all_results 
\ No newline at end of file
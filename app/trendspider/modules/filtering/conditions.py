@@ -1,122 +1,208 @@
 import logging
-from typing import Dict, Any, List
+import numpy as np
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 
 from ... import config
+from ..data.processor import collect_result_columns
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
-def matches_custom_filter_conditions(data: Dict[str, Any], filter_conditions: Dict[str, str]) -> bool:
+# Opcodes for compiled filter conditions
+OP_ABOVE = 0      # price > EMA
+OP_BELOW = 1      # price < EMA
+OP_ABOVE_BY = 2   # lower < % from EMA < upper
+OP_BELOW_BY = 3   # -upper < % from EMA < -lower
+OP_NEAR = 4       # |% from EMA| <= lower
+OP_PRESENT = 5    # unrecognized condition: only requires the EMA to exist
+OP_NEVER = 6      # malformed condition: never matches
+
+def _parse_condition(period_str: Any, condition: str) -> Tuple[int, int, float, float]:
+    """Parse one condition into a (period key, opcode, lower, upper) tuple, raising ValueError if malformed"""
+    try:
+        period_key = int(period_str)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid EMA period in filter condition {period_str}:{condition}") from None
+    if period_key <= 0:
+        raise ValueError(f"Invalid EMA period in filter condition {period_str}:{condition}")
+    if not isinstance(condition, str):
+        raise ValueError(f"Invalid filter condition {period_str}:{condition}")
+
+    if condition == "above":
+        return period_key, OP_ABOVE, 0.0, 0.0
+    if condition == "below":
+        return period_key, OP_BELOW, 0.0, 0.0
+
+    if condition.startswith("above_by:") or condition.startswith("below_by:"):
+        op = OP_ABOVE_BY if condition.startswith("above_by:") else OP_BELOW_BY
+        parts = condition.split(":")
+        try:
+            if len(parts) == 2:
+                # Single threshold: price must be X% or more above/below EMA
+                return period_key, op, float(parts[1]), float("inf")
+            if len(parts) == 3:
+                # Zone format: price must be between X% and Y% above/below EMA
+                return period_key, op, float(parts[1]), float(parts[2])
+        except ValueError:
+            pass
+        raise ValueError(f"Invalid filter condition {period_str}:{condition}")
+
+    if condition.startswith("near:"):
+        try:
+            return period_key, OP_NEAR, float(condition.split(":")[1]), 0.0
+        except ValueError:
+            raise ValueError(f"Invalid filter condition {period_str}:{condition}") from None
+
+    return period_key, OP_PRESENT, 0.0, 0.0
+
+def _compile_condition(period_str: Any, condition: str) -> Tuple[Optional[int], int, float, float]:
+    """Compile one condition, turning a malformed one into a never-matching entry"""
+    try:
+        return _parse_condition(period_str, condition)
+    except ValueError as e:
+        logger.error(str(e))
+        return None, OP_NEVER, 0.0, 0.0
+
+def validate_filter_conditions(filter_conditions: Dict[Any, str]) -> None:
     """
-    Check if a symbol matches custom filter conditions
+    Validate filter conditions before they are used for scanning
+    
+    Args:
+        filter_conditions: Dictionary of filter conditions
+        
+    Raises:
+        ValueError: If a period or condition is malformed
+    """
+    if not isinstance(filter_conditions, dict):
+        raise ValueError("FILTER_CONDITIONS must be a dictionary")
+    for period_str, condition in filter_conditions.items():
+        _parse_condition(period_str, condition)
+
+@lru_cache(maxsize=32)
+def _compile_condition_items(items: Tuple[Tuple[Any, str], ...]) -> Tuple[Tuple[Optional[int], int, float, float], ...]:
+    """Compile hashable condition items; cached so a scan's conditions are parsed once"""
+    return tuple(_compile_condition(period_str, condition) for period_str, condition in items)
+
+def compile_filter_conditions(filter_conditions: Dict[Any, str]) -> Tuple[Tuple[Optional[int], int, float, float], ...]:
+    """
+    Compile filter conditions into a plan of (period key, opcode, lower, upper) tuples
     
     Args:
-        data: Symbol data dictionary
         filter_conditions: Dictionary of filter conditions
         
+    Returns:
+        Compiled plan usable with matches_compiled_conditions
+    """
+    if not filter_conditions:
+        return ()
+    return _compile_condition_items(tuple(filter_conditions.items()))
+
+def matches_compiled_conditions(data: Dict[str, Any], plan: Tuple[Tuple[Optional[int], int, float, float], ...]) -> bool:
+    """
+    Check if a symbol matches a compiled filter plan
+    
+    Args:
+        data: Symbol data dictionary
+        plan: Plan from compile_filter_conditions
+        
     Returns:
         True if matches all conditions, False otherwise
     """
     # Return False if there was an error or no EMAs calculated
     if not data.get("success", False) or not data.get("emas"):
         return False
-        
-    # No conditions means everything matches
-    if not filter_conditions:
-        return True
-        
-    # Check each condition
-    for period_str, condition in filter_conditions.items():
-        try:
-            # Convert period to int if needed
-            period = int(period_str)
-            
-            # Skip if we don't have EMA data for this period
-            if str(period) not in data["emas"] or str(period) not in data["percent_from_ema"]:
-                return False
-                
-            # Get values
-            ema_value = data["emas"][str(period)]
-            price = data["price"]
-            percent_diff = data["percent_from_ema"][str(period)]
-            
-            # Check the condition
-            if condition == "above":
-                if price <= ema_value:
-                    return False
-            elif condition == "below":
-                if price >= ema_value:
-                    return False
-            elif condition.startswith("above_by:"):
-                # Handle both single threshold and zone formats
-                parts = condition.split(":")
-                if len(parts) == 2:
-                    # Single threshold: above_by:X (price must be X% or more above EMA)
-                    try:
-                        threshold = float(parts[1])
-                        if percent_diff <= threshold:
-                            return False
-                    except:
-                        # Invalid format, consider not matching
-                        return False
-                elif len(parts) == 3:
-                    # Zone format: above_by:X:Y (price must be between X% and Y% above EMA)
-                    try:
-                        min_threshold = float(parts[1])
-                        max_threshold = float(parts[2])
-                        # Ensure price is between min and max thresholds above EMA
-                        if percent_diff <= min_threshold or percent_diff >= max_threshold:
-                            return False
-                    except:
-                        # Invalid format, consider not matching
-                        return False
-                else:
-                    # Invalid format, consider not matching
-                    return False
-            elif condition.startswith("below_by:"):
-                # Handle both single threshold and zone formats
-                parts = condition.split(":")
-                if len(parts) == 2:
-                    # Single threshold: below_by:X (price must be X% or more below EMA)
-                    try:
-                        threshold = float(parts[1])
-                        if percent_diff >= -threshold:
-                            return False
-                    except:
-                        # Invalid format, consider not matching
-                        return False
-                elif len(parts) == 3:
-                    # Zone format: below_by:X:Y (price must be between X% and Y% below EMA)
-                    try:
-                        min_threshold = float(parts[1])
-                        max_threshold = float(parts[2])
-                        # Ensure price is between min and max thresholds below EMA (negative values)
-                        if percent_diff >= -min_threshold or percent_diff <= -max_threshold:
-                            return False
-                    except:
-                        # Invalid format, consider not matching
-                        return False
-                else:
-                    # Invalid format, consider not matching
-                    return False
-            elif condition.startswith("near:"):
-                # Extract percentage
-                try:
-                    threshold = float(condition.split(":")[1])
-                    if abs(percent_diff) > threshold:
-                        return False
-                except:
-                    # Invalid format, consider not matching
-                    return False
-                
-        except Exception as e:
-            logger.error(f"Error checking condition {period_str}:{condition} - {str(e)}")
-            # Consider not matching if there's an error
+
+    emas = data["emas"]
+    percent_from_ema = data["percent_from_ema"]
+    price = data["price"]
+
+    for period_key, op, lower, upper in plan:
+        if op == OP_NEVER:
             return False
-            
+
+        # Skip if we don't have EMA data for this period
+        if period_key not in emas or period_key not in percent_from_ema:
+            return False
+
+        if op == OP_ABOVE:
+            if price <= emas[period_key]:
+                return False
+        elif op == OP_BELOW:
+            if price >= emas[period_key]:
+                return False
+        elif op == OP_ABOVE_BY:
+            percent_diff = percent_from_ema[period_key]
+            if percent_diff <= lower or percent_diff >= upper:
+                return False
+        elif op == OP_BELOW_BY:
+            percent_diff = percent_from_ema[period_key]
+            if percent_diff >= -lower or percent_diff <= -upper:
+                return False
+        elif op == OP_NEAR:
+            if abs(percent_from_ema[period_key]) > lower:
+                return False
+
     # If we reach here, all conditions matched
     return True
 
+def evaluate_compiled_conditions(results: List[Dict[str, Any]], plan: Tuple[Tuple[Optional[int], int, float, float], ...]) -> np.ndarray:
+    """
+    Evaluate a compiled filter plan for all results at once
+    
+    Args:
+        results: List of symbol data dictionaries
+        plan: Plan from compile_filter_conditions
+        
+    Returns:
+        Boolean array, True where the result matches all conditions
+    """
+    # Collect every field the plan needs in one pass over the results
+    periods = sorted({period_key for period_key, op, _, _ in plan if op != OP_NEVER})
+    columns = collect_result_columns(results, periods)
+    
+    # Same preconditions as matches_compiled_conditions
+    mask = columns["valid"]
+    if not plan or not mask.any():
+        return mask
+
+    prices = columns["price"]
+    for period_key, op, lower, upper in plan:
+        if op == OP_NEVER:
+            mask[:] = False
+            break
+
+        # Missing EMA data is NaN and fails the condition
+        emas = columns[f"ema_{period_key}"]
+        percents = columns[f"percent_{period_key}"]
+        mask &= ~(np.isnan(emas) | np.isnan(percents))
+
+        if op == OP_ABOVE:
+            mask &= prices > emas
+        elif op == OP_BELOW:
+            mask &= prices < emas
+        elif op == OP_ABOVE_BY:
+            mask &= (percents > lower) & (percents < upper)
+        elif op == OP_BELOW_BY:
+            mask &= (percents < -lower) & (percents > -upper)
+        elif op == OP_NEAR:
+            mask &= np.abs(percents) <= lower
+
+    return mask
+
+def matches_custom_filter_conditions(data: Dict[str, Any], filter_conditions: Dict[str, str]) -> bool:
+    """
+    Check if a symbol matches custom filter conditions
+    
+    Args:
+        data: Symbol data dictionary
+        filter_conditions: Dictionary of filter conditions
+        
+    Returns:
+        True if matches all conditions, False otherwise
+    """
+    return matches_compiled_conditions(data, compile_filter_conditions(filter_conditions))
+
 def matches_filter_conditions(data: Dict[str, Any]) -> bool:
     """
     Check if a symbol matches all the filter conditions from config
@@ -131,7 +217,31 @@ def matches_filter_conditions(data: Dict[str, Any]) -> bool:
     filter_conditions = config.FILTER_CONDITIONS
     return matches_custom_filter_conditions(data, filter_conditions)
 
-def filter_and_sort_results(results: List[Dict[str, Any]], show_only_matching: bool = None) -> List[Dict[str, Any]]:
+def partition_results(results: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Split successful results into those matching the config filter conditions and the rest
+    
+    Args:
+        results: List of symbol data dictionaries
+        
+    Returns:
+        Tuple of (matching results, non-matching successful results), both in input order
+    """
+    # Compile the conditions once and evaluate them across all results
+    plan = compile_filter_conditions(config.FILTER_CONDITIONS)
+    mask = evaluate_compiled_conditions(results, plan)
+    
+    matching_results = []
+    non_matching = []
+    for data, matched in zip(results, mask):
+        if matched:
+            matching_results.append(data)
+        elif data.get("success", False):
+            non_matching.append(data)
+    return matching_results, non_matching
+
+def filter_and_sort_results(results: List[Dict[str, Any]], show_only_matching: bool = None,
+                            partitioned: Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
     """
     Filter and sort scan results based on configuration.
     This extracts the common logic used by both format_results and format_csv_for_tradingview.
@@ -139,6 +249,7 @@ def filter_and_sort_results(results: List[Dict[str, Any]], show_only_matching: b
     Args:
         results: List of symbol data dictionaries
         show_only_matching: Whether to show only matching symbols (uses config default if None)
+        partitioned: Output of partition_results for these results, if the caller already has it
         
     Returns:
         Filtered and sorted list of results
@@ -147,31 +258,20 @@ def filter_and_sort_results(results: List[Dict[str, Any]], show_only_matching: b
     if show_only_matching is None:
         show_only_matching = config.SHOW_ONLY_MATCHING
     
-    # Count total and filter if needed
-    matching_results = []
-    
-    for data in results:
-        # Skip failures
-        if not data.get("success", False):
-            continue
-            
-        # Check if it matches conditions
-        if matches_filter_conditions(data):
-            matching_results.append(data)
+    # Evaluate the conditions unless the caller already did
+    if partitioned is None:
+        partitioned = partition_results(results)
+    matching_results, non_matching = partitioned
             
-    # Use either filtered or all results
-    if show_only_matching:
-        display_results = matching_results
-    else:
-        # For unfiltered display, still put matches at the top
-        non_matching = [r for r in results if r.get("success", False) and r not in matching_results]
-        display_results = matching_results + non_matching
-        
     # Sort the results (import here to avoid circular imports)
     from ..formatting.results import sort_results
-    display_results = sort_results(display_results)
     
-    return display_results
+    # Use either filtered or all results
+    if show_only_matching:
+        return sort_results(matching_results)
+    
+    # For unfiltered display, still put matches at the top
+    return sort_results(matching_results + non_matching, first=matching_results)
 
 def format_condition_text(period: int, condition: str) -> str:
     """
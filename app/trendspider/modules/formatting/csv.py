@@ -1,12 +1,34 @@
 import logging
-from typing import List, Dict, Any, Tuple
+from typing import Iterator, List, Dict, Any, Optional, Tuple
 
 from ... import config
-from ..filtering.conditions import matches_filter_conditions, filter_and_sort_results
+from ..filtering.conditions import partition_results, filter_and_sort_results
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+def stream_csv_for_tradingview(results: List[Dict[str, Any]],
+                               partitioned: Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = None) -> Iterator[str]:
+    """
+    Stream the filtered results as TradingView watchlist lines
+    
+    Filtering and sorting use the current config and happen when this is
+    called; the lines are only built as the iterator is consumed.
+    
+    Args:
+        results: List of symbol data dictionaries
+        partitioned: Output of partition_results for these results, if the caller already has it
+        
+    Returns:
+        Iterator of newline-terminated lines, one per symbol
+    """
+    # Use shared filtering and sorting logic
+    display_results = filter_and_sort_results(results, partitioned=partitioned)
+    
+    # Format each symbol for TradingView: BYBIT:SYMBOL.P (perpetual futures),
+    # skipping failures (should already be filtered)
+    return (f"BYBIT:{data['symbol']}.P\n" for data in display_results if data.get("success", False))
+
 def format_csv_for_tradingview(results: List[Dict[str, Any]]) -> Tuple[str, int, int]:
     """
     Format the filtered results as a CSV for TradingView watchlist import
@@ -20,28 +42,11 @@ def format_csv_for_tradingview(results: List[Dict[str, Any]]) -> Tuple[str, int,
     # Count total processed
     total_processed = len(results)
     
-    # Count matching results before filtering
-    matching_count = len([r for r in results if r.get("success", False) and matches_filter_conditions(r)])
-    
-    # Use shared filtering and sorting logic
-    display_results = filter_and_sort_results(results)
-    
-    # Generate CSV content
-    csv_lines = []
-    
-    # Add each symbol in the format expected by TradingView
-    for data in display_results:
-        # Skip failures (should already be filtered)
-        if not data.get("success", False):
-            continue
-            
-        symbol = data["symbol"]
-        
-        # Format for TradingView: BYBIT:SYMBOL.P (perpetual futures)
-        tradingview_symbol = f"BYBIT:{symbol}.P"
-        csv_lines.append(tradingview_symbol)
+    # Evaluate the filter conditions once for the count and the display list
+    partitioned = partition_results(results)
+    matching_count = len(partitioned[0])
     
-    # Join with newlines
-    csv_content = "\n".join(csv_lines)
+    # Join the streamed lines, without a trailing newline
+    csv_content = "".join(stream_csv_for_tradingview(results, partitioned=partitioned))[:-1]
     
-    return csv_content, matching_count, total_processed
\ No newline at end of file
+    return csv_content, matching_count, total_processed
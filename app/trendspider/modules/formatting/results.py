@@ -1,21 +1,67 @@
+import io
 import logging
-from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+import time
+from functools import lru_cache
+from operator import itemgetter
+from typing import Callable, Dict, List, Any, Optional, Tuple
 
 from ... import config
-from ..filtering.conditions import matches_filter_conditions, format_condition_text, filter_and_sort_results
-from ..utils.numbers import format_number
+from ..filtering.conditions import partition_results, format_condition_text, filter_and_sort_results
+from ..utils.numbers import format_numbers
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
-def sort_results(results: List[Dict[str, Any]], sort_key: Optional[str] = None) -> List[Dict[str, Any]]:
+# Sort value for rows without a percentage for the sort period
+NEG_INF = float("-inf")
+
+# Table cell for a period without a percentage
+_MISSING_CELL = f" {'-':>8}"
+
+@lru_cache(maxsize=4)
+def _timeframe_label(timeframe: str) -> str:
+    """Cached human-readable timeframe label; TIMEFRAME rarely changes"""
+    return config.get_timeframe_label(timeframe)
+
+@lru_cache(maxsize=16)
+def _conditions_block(conditions: Tuple[Tuple[Any, str], ...]) -> str:
+    """Rendered conditions header for (period, condition) pairs; cached since FILTER_CONDITIONS rarely changes"""
+    lines = [f"• {format_condition_text(int(period_str), condition)}\n" for period_str, condition in conditions]
+    return "**Conditions:**\n" + "".join(lines) + "\n"
+
+@lru_cache(maxsize=8)
+def _make_sort_keyfn(sort_key: Optional[str]) -> Tuple[Callable[[Dict[str, Any]], Any], bool]:
+    """Build the (key function, reverse) pair for a sort key; cached since SORT_BY rarely changes"""
+    if sort_key == "price":
+        # Highest price first
+        return (lambda x: x.get("price", 0)), True
+    if sort_key == "volume":
+        # Highest volume first
+        return (lambda x: x.get("volume", 0)), True
+    if sort_key and sort_key.startswith("percent_"):
+        # Extract period
+        try:
+            period = int(sort_key.split("_")[1])
+        except (IndexError, ValueError):
+            # Fall back to alphabetical
+            return itemgetter("symbol"), False
+        # Sort by percentage difference from EMA, highest first
+        def keyfn(x: Dict[str, Any], _period: int = period, _neg: float = NEG_INF) -> float:
+            percent_from_ema = x.get("percent_from_ema")
+            return percent_from_ema.get(_period, _neg) if percent_from_ema else _neg
+        return keyfn, True
+    # Alphabetical by symbol (also used for unknown sort keys)
+    return itemgetter("symbol"), False
+
+def sort_results(results: List[Dict[str, Any]], sort_key: Optional[str] = None,
+                 first: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
     """
     Sort results based on the specified key
     
     Args:
         results: List of symbol data dictionaries
         sort_key: Key to sort by
+        first: Results to place ahead of the rest (e.g. filter matches), each group sorted by sort_key
         
     Returns:
         Sorted list of dictionaries
@@ -28,147 +74,122 @@ def sort_results(results: List[Dict[str, Any]], sort_key: Optional[str] = None)
     valid_results = [r for r in results if r.get("success", False)]
     failed_results = [r for r in results if not r.get("success", False)]
     
+    # Sort based on the key
+    keyfn, reverse = _make_sort_keyfn(sort_key)
+    if first:
+        # Fuse the group into the key so one sort keeps it on top; reverse flips the rank too
+        first_ids = {id(r) for r in first}
+        first_rank, rest_rank = (1, 0) if reverse else (0, 1)
+        sort_keyfn = keyfn
+        keyfn = lambda x: (first_rank if id(x) in first_ids else rest_rank, sort_keyfn(x))
     try:
-        # Sort based on the key
-        if sort_key == "symbol":
-            # Alphabetical by symbol
-            sorted_results = sorted(valid_results, key=lambda x: x["symbol"])
-        elif sort_key == "price":
-            # Highest price first
-            sorted_results = sorted(valid_results, key=lambda x: x.get("price", 0), reverse=True)
-        elif sort_key == "volume":
-            # Highest volume first
-            sorted_results = sorted(valid_results, key=lambda x: x.get("volume", 0), reverse=True)
-        elif sort_key and sort_key.startswith("percent_"):
-            # Extract period
-            try:
-                period = int(sort_key.split("_")[1])
-                # Sort by percentage difference from EMA, highest first
-                sorted_results = sorted(
-                    valid_results,
-                    key=lambda x: x.get("percent_from_ema", {}).get(str(period), -float("inf")),
-                    reverse=True
-                )
-            except:
-                # Fall back to alphabetical
-                sorted_results = sorted(valid_results, key=lambda x: x["symbol"])
+        sorted_results = sorted(valid_results, key=keyfn, reverse=reverse)
+    except TypeError as e:
+        # Values that can't be compared (e.g. a missing price); return unsorted,
+        # but still with the `first` group ahead of the rest
+        logger.error(f"Error sorting results: {str(e)}")
+        if first:
+            sorted_results = ([r for r in valid_results if id(r) in first_ids]
+                              + [r for r in valid_results if id(r) not in first_ids])
         else:
-            # Unknown sort key, use alphabetical
-            sorted_results = sorted(valid_results, key=lambda x: x["symbol"])
-            
-        # Append failed results at the end
-        return sorted_results + failed_results
+            sorted_results = valid_results
         
-    except Exception as e:
-        logger.error(f"Error sorting results: {str(e)}")
-        # Return unsorted on error
-        return valid_results + failed_results
+    # Append failed results at the end
+    return sorted_results + failed_results
 
-def format_results(results: List[Dict[str, Any]]) -> Tuple[str, int, int]:
+def format_results(results: List[Dict[str, Any]],
+                   partitioned: Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = None) -> Tuple[str, int, int]:
     """
     Format the filtered results for Discord message
     
     Args:
         results: List of symbol data dictionaries
+        partitioned: Output of partition_results for these results, if the caller already has it
         
     Returns:
         Tuple of (formatted text, matching count, total processed count)
     """
+    # Read the config once
+    timeframe = config.TIMEFRAME
+    filter_conditions = config.FILTER_CONDITIONS
+    sort_by = config.SORT_BY
+    show_only_matching = config.SHOW_ONLY_MATCHING
+    periods = config.EMA_PERIODS
+    
     # Count total processed
     total_processed = len(results)
     
-    # Count matching results before filtering
-    matching_count = len([r for r in results if r.get("success", False) and matches_filter_conditions(r)])
+    # Evaluate the filter conditions once for the count and the display list
+    if partitioned is None:
+        partitioned = partition_results(results)
+    matching_count = len(partitioned[0])
     
     # Use shared filtering and sorting logic
-    display_results = filter_and_sort_results(results)
+    display_results = filter_and_sort_results(results, show_only_matching, partitioned=partitioned)
     
-    # Generate output text
-    lines = []
+    # Generate output text into a single buffer
+    buf = io.StringIO()
     
     # Add header
-    timeframe_label = config.get_timeframe_label(config.TIMEFRAME)
-    lines.append(f"**EMA Scanner Results ({timeframe_label} Timeframe)**")
-    lines.append("")
+    timeframe_label = _timeframe_label(timeframe)
+    buf.write(f"**EMA Scanner Results ({timeframe_label} Timeframe)**\n\n")
     
     # Add conditions
-    if config.FILTER_CONDITIONS:
-        lines.append("**Conditions:**")
-        for period_str, condition in config.FILTER_CONDITIONS.items():
-            condition_text = format_condition_text(int(period_str), condition)
-            lines.append(f"• {condition_text}")
-        lines.append("")
+    if filter_conditions:
+        buf.write(_conditions_block(tuple(filter_conditions.items())))
         
     # Add sorting info
     sort_method = "Symbol (A-Z)"
-    if config.SORT_BY == "price":
+    if sort_by == "price":
         sort_method = "Price (Highest first)"
-    elif config.SORT_BY == "volume":
+    elif sort_by == "volume":
         sort_method = "Volume (Highest first)"
-    elif config.SORT_BY and config.SORT_BY.startswith("percent_"):
-        period = config.SORT_BY.split("_")[1]
+    elif sort_by and sort_by.startswith("percent_"):
+        period = sort_by.split("_")[1]
         sort_method = f"% from {period} EMA (Highest first)"
         
-    lines.append(f"**Results (Sorted by: {sort_method})**")
-    lines.append(f"**{matching_count}** matching symbols out of **{total_processed}** processed")
-    lines.append("")
+    buf.write(f"**Results (Sorted by: {sort_method})**\n")
+    buf.write(f"**{matching_count}** matching symbols out of **{total_processed}** processed\n\n")
     
     # If no results, return early
     if not display_results:
-        lines.append("*No results to display*")
-        output = "\n".join(lines)
-        return output, matching_count, total_processed
-    
-    # Determine periods for display
-    periods = config.EMA_PERIODS
+        buf.write("*No results to display*")
+        return buf.getvalue(), matching_count, total_processed
     
     # Format results in a Discord-friendly way (using code blocks for alignment)
-    lines.append("```")
+    buf.write("```\n")
     
     # Create header
-    header_parts = ["Symbol".ljust(12), "Price".rjust(8)]
+    buf.write(f"{'Symbol':<12} {'Price':>8}")
     for period in periods:
-        header_parts.append(f"%{period}".rjust(8))
+        buf.write(f" {'%' + str(period):>8}")
+    buf.write("\n")
+    buf.write("-" * (12 + 8 + (len(periods) * 9) + 1))
+    buf.write("\n")
     
-    lines.append(" ".join(header_parts))
-    lines.append("-" * (12 + 8 + (len(periods) * 9) + 1))
+    # Skip failures (should already be filtered) and format all prices at once
+    rows = [data for data in display_results if data.get("success", False)]
+    prices = format_numbers([data["price"] for data in rows])
     
     # Add data rows
-    for data in display_results:
-        # Skip failures (should already be filtered)
-        if not data.get("success", False):
-            continue
-            
-        # Get basic info
-        symbol = data["symbol"]
-        price = format_number(data["price"])
-        
-        # Build row parts
-        row_parts = [symbol[:12].ljust(12), price.rjust(8)]
-        
-        # Add percent differences
+    for data, price in zip(rows, prices):
+        # Add percent differences, one lookup per cell
+        percent_from_ema = data["percent_from_ema"]
+        cells = []
         for period in periods:
-            period_str = str(period)
-            if period_str in data["percent_from_ema"]:
-                percent = data["percent_from_ema"][period_str]
-                if percent > 0:
-                    percent_text = f"+{percent:.1f}%"
-                else:
-                    percent_text = f"{percent:.1f}%"
-                row_parts.append(percent_text.rjust(8))
+            percent = percent_from_ema.get(period)
+            if percent is None:
+                cells.append(_MISSING_CELL)
+            elif percent > 0:
+                cells.append(f" {f'+{percent:.1f}%':>8}")
             else:
-                row_parts.append("-".rjust(8))
-                
-        # Add row to output
-        lines.append(" ".join(row_parts))
+                cells.append(f" {f'{percent:.1f}%':>8}")
+        buf.write(f"{data['symbol'][:12]:<12} {price:>8}{''.join(cells)}\n")
         
-    lines.append("```")
+    buf.write("```\n")
     
     # Add footer with timestamp
-    lines.append("")
-    lines.append(f"*Scan completed at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*")
-    
-    # Join all lines
-    output = "\n".join(lines)
+    buf.write("\n")
+    buf.write(f"*Scan completed at {time.strftime('%Y-%m-%d %H:%M:%S')}*")
     
-    return output, matching_count, total_processed 
\ No newline at end of file
+    return buf.getvalue(), matching_count, total_processed
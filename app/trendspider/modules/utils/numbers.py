@@ -1,6 +1,15 @@
-from typing import Union
+import numpy as np
+from numbers import Real
+from typing import List, Sequence, Union
 from ... import config
 
+# (minimum magnitude, decimal places) for plain numbers, largest first; smaller values use 8
+_DECIMALS_TABLE = ((100, 2), (10, 3), (1, 4), (0.1, 5), (0.01, 6), (0.001, 7))
+_MIN_DECIMALS = 8
+
+# (minimum magnitude, divisor, suffix) for large numbers, largest first
+_SUFFIX_TABLE = ((1_000_000_000, 1_000_000_000, "B"), (1_000_000, 1_000_000, "M"), (1_000, 1_000, "K"))
+
 def format_number(value: Union[int, float]) -> str:
     """
     Format numbers for display with K, M, B suffixes
@@ -11,31 +20,15 @@ def format_number(value: Union[int, float]) -> str:
     Returns:
         Formatted string
     """
-    # Don't format if not enabled
-    if not config.FORMAT_LARGE_NUMBERS:
-        if isinstance(value, float):
-            # Round to 2-8 decimal places based on magnitude
-            if abs(value) >= 100:
-                return f"{value:.2f}"
-            elif abs(value) >= 10:
-                return f"{value:.3f}"
-            elif abs(value) >= 1:
-                return f"{value:.4f}"
-            elif abs(value) >= 0.1:
-                return f"{value:.5f}"
-            elif abs(value) >= 0.01:
-                return f"{value:.6f}"
-            elif abs(value) >= 0.001:
-                return f"{value:.7f}"
-            else:
-                return f"{value:.8f}"
+    # Leave anything that isn't a number as-is (numpy scalars count as numbers)
+    if not isinstance(value, Real):
         return str(value)
     
-    # Format with suffixes for large numbers
-    try:
-        abs_value = abs(value)
+    abs_value = abs(value)
+    
+    # Format with suffixes for large numbers, if enabled
+    if config.FORMAT_LARGE_NUMBERS:
         sign = "-" if value < 0 else ""
-        
         if abs_value >= 1_000_000_000:
             # Billions
             return f"{sign}{abs_value / 1_000_000_000:.2f}B"
@@ -45,23 +38,63 @@ def format_number(value: Union[int, float]) -> str:
         elif abs_value >= 1_000:
             # Thousands
             return f"{sign}{abs_value / 1_000:.2f}K"
-        elif isinstance(value, float):
-            # Scale decimal places based on magnitude
-            if abs_value >= 100:
-                return f"{value:.2f}"
-            elif abs_value >= 10:
-                return f"{value:.3f}"
-            elif abs_value >= 1:
-                return f"{value:.4f}"
-            elif abs_value >= 0.1:
-                return f"{value:.5f}"
-            elif abs_value >= 0.01:
-                return f"{value:.6f}"
-            elif abs_value >= 0.001:
-                return f"{value:.7f}"
-            else:
-                return f"{value:.8f}"
-        else:
-            return str(value)
-    except:
-        return str(value) 
\ No newline at end of file
+    
+    if not isinstance(value, float):
+        return str(value)
+    
+    # Round to 2-8 decimal places based on magnitude
+    if abs_value >= 100:
+        return f"{value:.2f}"
+    elif abs_value >= 10:
+        return f"{value:.3f}"
+    elif abs_value >= 1:
+        return f"{value:.4f}"
+    elif abs_value >= 0.1:
+        return f"{value:.5f}"
+    elif abs_value >= 0.01:
+        return f"{value:.6f}"
+    elif abs_value >= 0.001:
+        return f"{value:.7f}"
+    else:
+        return f"{value:.8f}"
+
+def format_numbers(values: Sequence[Union[int, float]]) -> List[str]:
+    """
+    Format many numbers at once, with the same output as format_number
+    
+    Values are grouped by display format and each group is formatted with a
+    single NumPy call instead of dispatching per value.
+    
+    Args:
+        values: Numbers to format
+        
+    Returns:
+        Formatted strings in input order
+    """
+    # Integers and other types keep their per-value formatting
+    if not all(isinstance(value, float) for value in values):
+        return [format_number(value) for value in values]
+    
+    numbers = np.asarray(values, dtype=np.float64)
+    magnitudes = np.abs(numbers)
+    formatted = np.empty(numbers.shape, dtype=object)
+    remaining = np.ones(numbers.shape, dtype=bool)
+    
+    # Large numbers with K/M/B suffixes
+    if config.FORMAT_LARGE_NUMBERS:
+        signs = np.where(numbers < 0, "-", "")
+        for minimum, divisor, suffix in _SUFFIX_TABLE:
+            group = remaining & (magnitudes >= minimum)
+            if group.any():
+                scaled = np.char.mod("%.2f", magnitudes[group] / divisor)
+                formatted[group] = np.char.add(np.char.add(signs[group], scaled), suffix)
+                remaining &= ~group
+    
+    # Decimal places scaled by magnitude
+    for minimum, decimals in _DECIMALS_TABLE + ((-np.inf, _MIN_DECIMALS),):
+        group = remaining & ~(magnitudes < minimum)
+        if group.any():
+            formatted[group] = np.char.mod(f"%.{decimals}f", numbers[group])
+            remaining &= ~group
+    
+    return [str(text) for text in formatted]
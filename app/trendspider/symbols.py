@@ -3,5 +3,8 @@
 
 from ..core.symbols import TRADING_SYMBOLS, get_trading_symbols
 
-# For backward compatibility, expose the symbols list directly
-symbols = TRADING_SYMBOLS
+# For backward compatibility, expose the symbols directly (immutable, in the core list's order)
+symbols = tuple(TRADING_SYMBOLS)
+
+# Use for membership tests: O(1) instead of scanning the tuple
+symbol_set = frozenset(symbols)
@@ -1,9 +1,14 @@
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 import uvicorn
 import asyncio
 import logging
-from fastapi.concurrency import run_in_threadpool
+
+try:
+    import orjson
+except ImportError:  # Optional dependency - fall back to the stdlib json encoder
+    orjson = None
 
 from app.core.config import settings
 from app.routers import health, market, trendspider, auth
@@ -16,28 +21,37 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Create FastAPI application instance
-app = FastAPI(title=settings.app_name, version=settings.version)
+# Serialize JSON responses with orjson when it is installed
+app = FastAPI(
+    title=settings.app_name,
+    version=settings.version,
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
+)
 
-# Add middleware to log all requests
-@app.middleware("http")
+# Request logging middleware, only registered in debug mode so normal requests
+# don't pay for per-request log formatting
 async def log_requests(request: Request, call_next):
     # Log all requests, especially OPTIONS
     client_host = request.client.host if request.client else "unknown"
-    logger.info(f"Request: {request.method} {request.url.path} from {client_host}")
-    logger.info(f"Headers: {dict(request.headers)}")
+    logger.info("Request: %s %s from %s", request.method, request.url.path, client_host)
+    logger.info("Headers: %s", request.headers)
     
     if request.method == "OPTIONS":
-        logger.info(f"OPTIONS request to {request.url.path}")
-        logger.info(f"Origin header: {request.headers.get('origin', 'Not set')}")
-        logger.info(f"Access-Control-Request-Method: {request.headers.get('access-control-request-method', 'Not set')}")
-        logger.info(f"Access-Control-Request-Headers: {request.headers.get('access-control-request-headers', 'Not set')}")
+        headers = request.headers
+        logger.info("OPTIONS request to %s", request.url.path)
+        logger.info("Origin header: %s", headers.get('origin', 'Not set'))
+        logger.info("Access-Control-Request-Method: %s", headers.get('access-control-request-method', 'Not set'))
+        logger.info("Access-Control-Request-Headers: %s", headers.get('access-control-request-headers', 'Not set'))
     
     response = await call_next(request)
     
-    logger.info(f"Response: {response.status_code} for {request.method} {request.url.path}")
+    logger.info("Response: %s for %s %s", response.status_code, request.method, request.url.path)
     
     return response
 
+if settings.DEBUG:
+    app.middleware("http")(log_requests)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -60,34 +74,16 @@ app.include_router(ai_router.router)
 # Background tasks: refresh caches and run Bybit monitor
 # ---------------------------------------------------------------------------
 
+from app.core.scheduler import PeriodicScheduler
 from app.services.fully_diluted_service import update_fully_diluted_cache
 from app.services.market_analysis_service import update_market_analysis_cache
 from app.services.bybit_monitor_service import bybit_monitor_service
 from app.trendspider import trendspider_setup
+from app.trendspider.modules import warm_up_ema_kernel
+from fastapi.concurrency import run_in_threadpool
 
-
-async def _fully_diluted_cache_refresher() -> None:
-    """Periodically refresh the fully-diluted coins cache."""
-    # Populate cache once before entering the loop so that initial requests
-    # have data available as soon as possible.
-    await run_in_threadpool(update_fully_diluted_cache)
-
-    while True:
-        await asyncio.sleep(settings.fully_diluted_update_interval)
-        await run_in_threadpool(update_fully_diluted_cache)
-
-
-async def _market_analysis_cache_refresher() -> None:
-    """Periodically refresh the market analysis cache."""
-    # Wait a bit for Bybit data to be available before first refresh
-    await asyncio.sleep(60)  # Wait 1 minute after startup
-    
-    # Populate cache once before entering the loop
-    await update_market_analysis_cache()
-
-    while True:
-        await asyncio.sleep(settings.market_analysis_update_interval)
-        await update_market_analysis_cache()
+# One scheduler task drives all periodic cache refreshes
+scheduler = PeriodicScheduler()
 
 
 # Register startup event to launch background tasks
@@ -104,12 +100,21 @@ async def start_background_tasks() -> None:
     # Initialize TrendSpider module
     trendspider_setup()
     
+    # Compile the optional numba EMA kernel off the event loop, before the first scan needs it
+    await run_in_threadpool(warm_up_ema_kernel)
+    
     # Start the Bybit monitor service
     await bybit_monitor_service.start()
     
-    # Start cache refresh tasks
-    asyncio.create_task(_fully_diluted_cache_refresher())
-    asyncio.create_task(_market_analysis_cache_refresher())
+    # Populate the fully-diluted cache right away so that initial requests
+    # have data available as soon as possible.
+    scheduler.add(settings.fully_diluted_update_interval, update_fully_diluted_cache, run_in_thread=True)
+    
+    # Wait a bit for Bybit data to be available before the first market analysis refresh
+    scheduler.add(settings.market_analysis_update_interval, update_market_analysis_cache, initial_delay=60)
+    
+    # Start cache refresh scheduler
+    asyncio.create_task(scheduler.run())
 
 
 # Register shutdown event to clean up background tasks
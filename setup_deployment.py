@@ -6,9 +6,26 @@ Verifies database initialization and system readiness.
 
 import os
 import sys
+import hashlib
 import secrets
 import subprocess
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional, Tuple
+
+# Add the backend directory to Python path (once)
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Interpreter facts that can't change while the process runs
+PYTHON_VERSION_OK = sys.version_info >= (3, 8)
+IN_VIRTUAL_ENV = hasattr(sys, 'real_prefix') or (hasattr(sys, 'base_prefix') and sys.base_prefix != sys.prefix)
+
+DATA_DIR = Path("./data").absolute()
+DEFAULT_JWT_SECRET = "your-secret-key-change-this-in-production"
+SETUP_CACHE_DIR = Path(".cache/setup")
+PIP_CACHE_DIR = Path(".cache/pip")
 
 def generate_jwt_secret():
     """Generate a secure JWT secret key."""
@@ -17,7 +34,7 @@ def generate_jwt_secret():
 def check_python_version():
     """Check if Python version is compatible."""
     version = sys.version_info
-    if version.major < 3 or (version.major == 3 and version.minor < 8):
+    if not PYTHON_VERSION_OK:
         print("❌ Python 3.8+ required. Current version:", f"{version.major}.{version.minor}.{version.micro}")
         return False
     print(f"✅ Python version: {version.major}.{version.minor}.{version.micro}")
@@ -25,18 +42,37 @@ def check_python_version():
 
 def check_virtual_environment():
     """Check if running in virtual environment."""
-    in_venv = hasattr(sys, 'real_prefix') or (hasattr(sys, 'base_prefix') and sys.base_prefix != sys.prefix)
-    if in_venv:
+    if IN_VIRTUAL_ENV:
         print("✅ Running in virtual environment")
     else:
         print("⚠️  Not running in virtual environment (recommended for production)")
     return True
 
+def _requirements_digest(requirements: Path) -> str:
+    """Hash of requirements.txt and the interpreter it was installed into."""
+    digest = hashlib.sha256(requirements.read_bytes())
+    digest.update(sys.executable.encode())
+    return digest.hexdigest()
+
 def install_dependencies():
-    """Install required dependencies."""
+    """Install required dependencies, skipping pip if requirements.txt is unchanged since the last install."""
+    requirements = Path("requirements.txt")
+    stamp_file = SETUP_CACHE_DIR / "requirements.sha256"
+    digest = _requirements_digest(requirements)
+    
+    if stamp_file.exists() and stamp_file.read_text().strip() == digest:
+        print("✅ Dependencies cached (requirements.txt unchanged)")
+        return True
+    
     print("📦 Installing dependencies...")
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+        subprocess.check_call([
+            sys.executable, "-m", "pip", "install",
+            "--cache-dir", str(PIP_CACHE_DIR),
+            "-r", str(requirements)
+        ])
+        SETUP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        stamp_file.write_text(digest)
         print("✅ Dependencies installed successfully")
         return True
     except subprocess.CalledProcessError as e:
@@ -60,85 +96,116 @@ def setup_environment_file():
     
     # Read template
     with open(env_example, 'r') as f:
-        content = f.read()
+        lines = f.readlines()
     
-    # Generate JWT secret
-    jwt_secret = generate_jwt_secret()
-    content = content.replace('your-super-secret-jwt-key-change-this-in-production-make-it-long-and-random', jwt_secret)
+    # Set JWT_SECRET_KEY by key, whatever placeholder the template uses (appended if missing)
+    jwt_line = f"JWT_SECRET_KEY={generate_jwt_secret()}\n"
+    for i, line in enumerate(lines):
+        if line.split("=", 1)[0].strip() == "JWT_SECRET_KEY":
+            lines[i] = jwt_line
+            break
+    else:
+        if lines and not lines[-1].endswith("\n"):
+            lines[-1] += "\n"
+        lines.append(jwt_line)
     
     # Write .env file
     with open(env_file, 'w') as f:
-        f.write(content)
+        f.writelines(lines)
     
     print("✅ .env file created with secure JWT secret")
     print("⚠️  Please edit .env file to set your GEMINI_API_KEY and other production values")
     return True
 
-def verify_database_initialization():
-    """Verify that databases can be initialized."""
-    print("🗄️  Verifying database initialization...")
+@lru_cache(maxsize=8)
+def _scan_db_files(dir_path: str, dir_mtime_ns: int) -> Tuple[Tuple[str, int], ...]:
+    """(name, size) of the .db files in a directory; keyed by its mtime so new or removed files invalidate it."""
+    # Filter on the name first; is_file() comes from the directory read, so stat() on
+    # matching entries is the only per-file syscall (and is cached on the entry)
+    with os.scandir(dir_path) as entries:
+        return tuple(
+            (entry.name, entry.stat().st_size)
+            for entry in entries
+            if entry.name.endswith(".db") and entry.is_file()
+        )
+
+def import_services():
+    """Import the application services once; importing them initializes the databases."""
+    print("📥 Importing application services...")
     
     try:
-        # Import database services to trigger initialization
-        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-        
+        from app.core.config import settings
         from app.services.user_db import user_db
         from app.services.ai_assistant_db import ai_assistant_db
+    except Exception as e:
+        print(f"❌ Failed to import application services: {e}")
+        return None
+    
+    return settings, user_db, ai_assistant_db
+
+def verify_databases(user_db, ai_assistant_db):
+    """Verify that both databases are initialized and answer queries."""
+    print("🗄️  Verifying databases...")
+    
+    try:
+        whitelist = user_db.get_whitelist_emails()
+        print(f"✅ User database initialized ({len(whitelist)} whitelisted emails)")
         
-        print("✅ User database initialized")
+        # One query proves both connectivity and that the trade_questions table exists
+        ai_assistant_db.get_user_questionnaire("test@example.com")
         print("✅ AI Assistant database initialized")
+        print("✅ trade_questions table accessible (returned None as expected for non-existent user)")
         
-        # Check if data directory exists
-        data_dir = Path("./data")
-        if data_dir.exists():
-            print(f"✅ Data directory exists: {data_dir.absolute()}")
+        # Check if data directory exists (one stat for the check and the listing cache key)
+        try:
+            data_dir_mtime_ns = os.stat(DATA_DIR).st_mtime_ns
+        except FileNotFoundError:
+            data_dir_mtime_ns = None
+        if data_dir_mtime_ns is not None:
+            print(f"✅ Data directory exists: {DATA_DIR}")
             
             # List database files
-            db_files = list(data_dir.glob("*.db"))
-            for db_file in db_files:
-                size = db_file.stat().st_size
-                print(f"   📁 {db_file.name}: {size} bytes")
+            for name, size in _scan_db_files(str(DATA_DIR), data_dir_mtime_ns):
+                print(f"   📁 {name}: {size} bytes")
         
         return True
         
     except Exception as e:
-        print(f"❌ Database initialization failed: {e}")
+        print(f"❌ Database verification failed: {e}")
         return False
 
-def verify_questionnaire_table():
-    """Verify that trade_questions table exists and is accessible."""
-    print("📋 Verifying questionnaire table...")
-    
+@lru_cache(maxsize=1)
+def _load_env_cached(path: str, mtime_ns: int) -> Tuple[Tuple[str, str], ...]:
+    """Parse a .env file once per (path, mtime); editing the file changes the key."""
+    from dotenv import dotenv_values
+    return tuple((key, value) for key, value in dotenv_values(path).items() if value is not None)
+
+def _env_file_mtime(path: str) -> Optional[int]:
+    """Modification time of the .env file, or None if it doesn't exist."""
     try:
-        from app.services.ai_assistant_db import ai_assistant_db
-        
-        # Test table access
-        test_result = ai_assistant_db.get_user_questionnaire("test@example.com")
-        print("✅ trade_questions table accessible (returned None as expected for non-existent user)")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Questionnaire table verification failed: {e}")
-        return False
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
 
-def check_required_environment_vars():
+def check_required_environment_vars(settings):
     """Check if required environment variables are set."""
     print("🔐 Checking environment variables...")
     
-    # Load environment
-    from app.core.config import settings
-    import os
-    from dotenv import load_dotenv
+    # Load .env file (parsed once per file version), without overriding existing variables
+    env = os.environ
+    mtime_ns = _env_file_mtime(".env")
+    if mtime_ns is not None:
+        for key, value in _load_env_cached(".env", mtime_ns):
+            env.setdefault(key, value)
     
-    # Load .env file
-    load_dotenv()
+    # Snapshot the values checked below
+    jwt_secret = env.get("JWT_SECRET_KEY", DEFAULT_JWT_SECRET)
+    gemini_api_key = settings.gemini_api_key
     
     checks = []
     
     # JWT Secret
-    jwt_secret = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-this-in-production")
-    if jwt_secret != "your-secret-key-change-this-in-production":
+    if jwt_secret != DEFAULT_JWT_SECRET:
         print("✅ JWT_SECRET_KEY is set")
         checks.append(True)
     else:
@@ -146,7 +213,7 @@ def check_required_environment_vars():
         checks.append(False)
     
     # Gemini API Key
-    if settings.gemini_api_key:
+    if gemini_api_key:
         print("✅ GEMINI_API_KEY is set")
         checks.append(True)
     else:
@@ -155,28 +222,6 @@ def check_required_environment_vars():
     
     return all(checks)
 
-def test_basic_functionality():
-    """Test basic application functionality."""
-    print("🧪 Testing basic functionality...")
-    
-    try:
-        # Test user database
-        from app.services.user_db import user_db
-        whitelist = user_db.get_whitelist_emails()
-        print(f"✅ User database functional ({len(whitelist)} whitelisted emails)")
-        
-        # Test AI assistant database
-        from app.services.ai_assistant_db import ai_assistant_db
-        # This should not fail even with empty database
-        result = ai_assistant_db.get_user_questionnaire("nonexistent@test.com")
-        print("✅ AI Assistant database functional")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Basic functionality test failed: {e}")
-        return False
-
 def create_admin_user_prompt():
     """Prompt to create admin user."""
     print("\n👤 Admin User Setup")
@@ -211,35 +256,40 @@ def main():
     checks.append(setup_environment_file())
     checks.append(install_dependencies())
     
-    # Database verification
-    checks.append(verify_database_initialization())
-    checks.append(verify_questionnaire_table())
-    
-    # Configuration checks
-    checks.append(check_required_environment_vars())
-    
-    # Functionality tests
-    checks.append(test_basic_functionality())
+    # Import the application services once and share them across the checks
+    services = import_services()
+    if services is None:
+        checks.append(False)
+    else:
+        settings, user_db, ai_assistant_db = services
+        
+        # Database verification
+        checks.append(verify_databases(user_db, ai_assistant_db))
+        
+        # Configuration checks
+        checks.append(check_required_environment_vars(settings))
     
-    print("\n" + "=" * 60)
-    print("SETUP SUMMARY")
-    print("=" * 60)
+    # Write the summary in one call
+    summary = ["\n" + "=" * 60, "SETUP SUMMARY", "=" * 60]
     
     if all(checks):
-        print("🎉 ALL CHECKS PASSED!")
-        print("✅ Your backend is ready for deployment")
-        print("\nNext steps:")
-        print("1. Edit .env file with your production values")
-        print("2. Create admin user with admin_tools.py")
-        print("3. Start the application with: python main.py")
+        summary += [
+            "🎉 ALL CHECKS PASSED!",
+            "✅ Your backend is ready for deployment",
+            "\nNext steps:",
+            "1. Edit .env file with your production values",
+            "2. Create admin user with admin_tools.py",
+            "3. Start the application with: python main.py",
+        ]
+        print("\n".join(summary), flush=True)
         
         create_admin_user_prompt()
         
         return 0
     else:
         failed_count = len([c for c in checks if not c])
-        print(f"❌ {failed_count} checks failed")
-        print("Please fix the issues above before deploying")
+        summary += [f"❌ {failed_count} checks failed", "Please fix the issues above before deploying"]
+        print("\n".join(summary), flush=True)
         return 1
 
 if __name__ == "__main__":
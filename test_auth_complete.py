@@ -8,28 +8,91 @@ import sys
 import os
 import requests
 import json
-from typing import Dict, Any
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-# Add the backend directory to Python path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Add the backend directory to Python path (once)
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
 
 # Test configuration
-BASE_URL = "http://localhost:8000"
+BASE_URL = "http://127.0.0.1:8000"  # IP literal, so no name resolution per connection
+
+# (connect, read) timeouts in seconds for requests that don't set their own
+DEFAULT_TIMEOUT = (1, 5)
+# The chat endpoint waits on the AI model, so it gets a longer read timeout
+CHAT_TIMEOUT = (1, 60)
+
+# Endpoint URLs
+URL_HEALTH = f"{BASE_URL}/health"
+URL_CHECK_EMAIL = f"{BASE_URL}/api/auth/check-email"
+URL_LOGIN = f"{BASE_URL}/api/auth/login"
+URL_ME = f"{BASE_URL}/api/auth/me"
+URL_CHAT_MESSAGE = f"{BASE_URL}/api/chat/message"
+URL_CHAT_RECENT = f"{BASE_URL}/api/chat/recent"
+
 TEST_USERS = [
     {"email": "lampensn@icloud.com", "password": "Noah123123"},  # Padded password
     {"email": "user2@example.com", "password": "password2"},
     {"email": "user3@example.com", "password": "password3"}
 ]
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+def emit(lines: List[str]) -> None:
+    """Write collected output lines in a single call and clear the list."""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+        lines.clear()
+
+def _json_body(payload: Dict[str, Any]) -> bytes:
+    """Serialize a request body once so it can be sent as raw bytes."""
+    return json.dumps(payload).encode()
+
+def requires_token(func: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+    """Skip a per-user test when the user has no token; otherwise pass in their auth headers."""
+    @functools.wraps(func)
+    def wrapper(self, email: str, *args, **kwargs) -> Dict[str, Any]:
+        headers = self.auth_headers.get(email)
+        if headers is None:
+            return {"success": False, "error": "No token for user"}
+        return func(self, email, headers, *args, **kwargs)
+    return wrapper
+
+class TimeoutSession(requests.Session):
+    """Session that applies DEFAULT_TIMEOUT to requests made without a timeout."""
+    
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
 class AuthTester:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = TimeoutSession()
+        # Keep-alive pool sized for concurrent per-user requests; retries apply to idempotent methods only
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16,
+                              max_retries=Retry(total=2, backoff_factor=0.1))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         self.tokens = {}
+        self.auth_headers = {}
+        
+        # Request bodies for the known test users, serialized once
+        self.whitelist_bodies = {user["email"]: _json_body({"email": user["email"]}) for user in TEST_USERS}
+        self.login_bodies = {
+            (user["email"], user["password"]): _json_body({"email": user["email"], "password": user["password"]})
+            for user in TEST_USERS
+        }
         
     def test_server_health(self) -> bool:
         """Test if the server is running."""
         try:
-            response = self.session.get(f"{BASE_URL}/health")
+            response = self.session.get(URL_HEALTH)
             return response.status_code == 200
         except requests.exceptions.ConnectionError:
             return False
@@ -37,9 +100,11 @@ class AuthTester:
     def test_email_whitelist_check(self, email: str) -> bool:
         """Test email whitelist checking."""
         try:
+            body = self.whitelist_bodies.get(email) or _json_body({"email": email})
             response = self.session.post(
-                f"{BASE_URL}/api/auth/check-email",
-                json={"email": email}
+                URL_CHECK_EMAIL,
+                data=body,
+                headers=JSON_HEADERS
             )
             if response.status_code == 200:
                 data = response.json()
@@ -52,28 +117,28 @@ class AuthTester:
     def test_user_login(self, email: str, password: str) -> Dict[str, Any]:
         """Test user login and return token info."""
         try:
+            body = self.login_bodies.get((email, password)) or _json_body({"email": email, "password": password})
             response = self.session.post(
-                f"{BASE_URL}/api/auth/login",
-                json={"email": email, "password": password}
+                URL_LOGIN,
+                data=body,
+                headers=JSON_HEADERS
             )
             
             if response.status_code == 200:
                 data = response.json()
                 self.tokens[email] = data["access_token"]
+                self.auth_headers[email] = {"Authorization": f"Bearer {data['access_token']}"}
                 return {"success": True, "data": data}
             else:
                 return {"success": False, "error": response.text, "status": response.status_code}
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    def test_protected_endpoint(self, email: str) -> Dict[str, Any]:
+    @requires_token
+    def test_protected_endpoint(self, email: str, headers: Dict[str, str]) -> Dict[str, Any]:
         """Test accessing a protected endpoint with JWT token."""
-        if email not in self.tokens:
-            return {"success": False, "error": "No token for user"}
-        
         try:
-            headers = {"Authorization": f"Bearer {self.tokens[email]}"}
-            response = self.session.get(f"{BASE_URL}/api/auth/me", headers=headers)
+            response = self.session.get(URL_ME, headers=headers)
             
             if response.status_code == 200:
                 return {"success": True, "data": response.json()}
@@ -82,20 +147,18 @@ class AuthTester:
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    def test_ai_chat_separation(self, email: str, message: str) -> Dict[str, Any]:
+    @requires_token
+    def test_ai_chat_separation(self, email: str, headers: Dict[str, str], message: str) -> Dict[str, Any]:
         """Test AI chat with user separation."""
-        if email not in self.tokens:
-            return {"success": False, "error": "No token for user"}
-        
         try:
-            headers = {"Authorization": f"Bearer {self.tokens[email]}"}
             response = self.session.post(
-                f"{BASE_URL}/api/chat/message",
+                URL_CHAT_MESSAGE,
                 json={
                     "message": message,
                     "status": "pre-trade"
                 },
-                headers=headers
+                headers=headers,
+                timeout=CHAT_TIMEOUT
             )
             
             if response.status_code == 200:
@@ -105,14 +168,11 @@ class AuthTester:
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    def test_chat_history_separation(self, email: str) -> Dict[str, Any]:
+    @requires_token
+    def test_chat_history_separation(self, email: str, headers: Dict[str, str]) -> Dict[str, Any]:
         """Test that users can only see their own chat history."""
-        if email not in self.tokens:
-            return {"success": False, "error": "No token for user"}
-        
         try:
-            headers = {"Authorization": f"Bearer {self.tokens[email]}"}
-            response = self.session.get(f"{BASE_URL}/api/chat/recent", headers=headers)
+            response = self.session.get(URL_CHAT_RECENT, headers=headers)
             
             if response.status_code == 200:
                 return {"success": True, "data": response.json()}
@@ -121,119 +181,128 @@ class AuthTester:
         except Exception as e:
             return {"success": False, "error": str(e)}
     
+    def for_each_user(self, func: Callable[..., Any], *args_lists: List[Any]) -> List[Any]:
+        """Call func for each user concurrently; results are returned in TEST_USERS order."""
+        with ThreadPoolExecutor(max_workers=max(1, len(TEST_USERS))) as executor:
+            return list(executor.map(func, *args_lists))
+    
     def run_comprehensive_test(self):
         """Run all authentication tests."""
-        print("=" * 80)
-        print("JWT AUTHENTICATION SYSTEM - COMPREHENSIVE TEST")
-        print("=" * 80)
+        # Output is collected per section and written in one call
+        out = []
+        out.append("=" * 80)
+        out.append("JWT AUTHENTICATION SYSTEM - COMPREHENSIVE TEST")
+        out.append("=" * 80)
         
         # Test 1: Server Health
-        print("\n1. Testing server health...")
+        out.append("\n1. Testing server health...")
         if not self.test_server_health():
-            print("❌ Server is not running! Please start the server first.")
-            print("   Run: python main.py")
+            out.append("❌ Server is not running! Please start the server first.")
+            out.append("   Run: python main.py")
+            emit(out)
             return False
-        print("✅ Server is running")
+        out.append("✅ Server is running")
+        
+        emit(out)
         
         # Test 2: Email Whitelist
-        print("\n2. Testing email whitelist...")
-        for user in TEST_USERS:
-            email = user["email"]
-            is_whitelisted = self.test_email_whitelist_check(email)
-            if is_whitelisted:
-                print(f"✅ {email} is whitelisted")
+        out.append("\n2. Testing email whitelist...")
+        emails = [user["email"] for user in TEST_USERS]
+        non_whitelisted = "notwhitelisted@example.com"
+        # The non-whitelisted probe runs in the same pooled round as the test users
+        *whitelist_results, is_whitelisted = self.for_each_user(
+            self.test_email_whitelist_check, emails + [non_whitelisted]
+        )
+        for email, user_whitelisted in zip(emails, whitelist_results):
+            if user_whitelisted:
+                out.append(f"✅ {email} is whitelisted")
             else:
-                print(f"❌ {email} is NOT whitelisted")
+                out.append(f"❌ {email} is NOT whitelisted")
         
         # Test non-whitelisted email
-        non_whitelisted = "notwhitelisted@example.com"
-        is_whitelisted = self.test_email_whitelist_check(non_whitelisted)
         if not is_whitelisted:
-            print(f"✅ {non_whitelisted} correctly NOT whitelisted")
+            out.append(f"✅ {non_whitelisted} correctly NOT whitelisted")
         else:
-            print(f"❌ {non_whitelisted} should NOT be whitelisted")
+            out.append(f"❌ {non_whitelisted} should NOT be whitelisted")
+        
+        emit(out)
         
         # Test 3: User Login
-        print("\n3. Testing user login...")
-        login_results = {}
-        for user in TEST_USERS:
-            email = user["email"]
-            password = user["password"]
-            result = self.test_user_login(email, password)
-            login_results[email] = result
-            
+        out.append("\n3. Testing user login...")
+        passwords = [user["password"] for user in TEST_USERS]
+        login_results = dict(zip(emails, self.for_each_user(self.test_user_login, emails, passwords)))
+        for email, result in login_results.items():
             if result["success"]:
                 user_data = result["data"]["user"]
-                print(f"✅ {email} login successful (User ID: {user_data['id']})")
+                out.append(f"✅ {email} login successful (User ID: {user_data['id']})")
             else:
-                print(f"❌ {email} login failed: {result.get('error', 'Unknown error')}")
+                out.append(f"❌ {email} login failed: {result.get('error', 'Unknown error')}")
+        
+        emit(out)
         
         # Test 4: Protected Endpoints
-        print("\n4. Testing protected endpoints...")
-        for user in TEST_USERS:
-            email = user["email"]
-            if login_results[email]["success"]:
-                result = self.test_protected_endpoint(email)
-                if result["success"]:
-                    user_data = result["data"]
-                    print(f"✅ {email} can access protected endpoint (ID: {user_data['id']})")
-                else:
-                    print(f"❌ {email} cannot access protected endpoint: {result.get('error')}")
+        out.append("\n4. Testing protected endpoints...")
+        logged_in = [email for email in emails if login_results[email]["success"]]
+        for email, result in zip(logged_in, self.for_each_user(self.test_protected_endpoint, logged_in)):
+            if result["success"]:
+                user_data = result["data"]
+                out.append(f"✅ {email} can access protected endpoint (ID: {user_data['id']})")
+            else:
+                out.append(f"❌ {email} cannot access protected endpoint: {result.get('error')}")
+        
+        emit(out)
         
         # Test 5: AI Chat User Separation
-        print("\n5. Testing AI chat user separation...")
-        chat_results = {}
-        for i, user in enumerate(TEST_USERS):
-            email = user["email"]
-            if login_results[email]["success"]:
-                message = f"Hello, this is a test message from user {i+1}"
-                result = self.test_ai_chat_separation(email, message)
-                chat_results[email] = result
-                
-                if result["success"]:
-                    chat_data = result["data"]
-                    chat_id = chat_data["chat_id"]
-                    print(f"✅ {email} created chat session: {chat_id}")
-                else:
-                    print(f"❌ {email} failed to create chat: {result.get('error')}")
+        out.append("\n5. Testing AI chat user separation...")
+        messages = [f"Hello, this is a test message from user {emails.index(email)+1}" for email in logged_in]
+        chat_results = dict(zip(logged_in, self.for_each_user(self.test_ai_chat_separation, logged_in, messages)))
+        for email, result in chat_results.items():
+            if result["success"]:
+                chat_data = result["data"]
+                chat_id = chat_data["chat_id"]
+                out.append(f"✅ {email} created chat session: {chat_id}")
+            else:
+                out.append(f"❌ {email} failed to create chat: {result.get('error')}")
+        
+        emit(out)
         
         # Test 6: Chat History Separation
-        print("\n6. Testing chat history separation...")
-        for user in TEST_USERS:
-            email = user["email"]
-            if login_results[email]["success"]:
-                result = self.test_chat_history_separation(email)
-                if result["success"]:
-                    chats = result["data"]["chats"]
-                    print(f"✅ {email} can see {len(chats)} chat(s)")
-                    # Verify user can only see their own chats
-                    for chat in chats:
-                        print(f"   - Chat: {chat['id']} ({chat.get('title', 'No title')})")
-                else:
-                    print(f"❌ {email} cannot access chat history: {result.get('error')}")
+        out.append("\n6. Testing chat history separation...")
+        for email, result in zip(logged_in, self.for_each_user(self.test_chat_history_separation, logged_in)):
+            if result["success"]:
+                chats = result["data"]["chats"]
+                out.append(f"✅ {email} can see {len(chats)} chat(s)")
+                # Verify user can only see their own chats
+                for chat in chats:
+                    out.append(f"   - Chat: {chat['id']} ({chat.get('title', 'No title')})")
+            else:
+                out.append(f"❌ {email} cannot access chat history: {result.get('error')}")
+        
+        emit(out)
         
         # Test 7: Invalid Token
-        print("\n7. Testing invalid token handling...")
+        out.append("\n7. Testing invalid token handling...")
         try:
             headers = {"Authorization": "Bearer invalid_token_here"}
-            response = self.session.get(f"{BASE_URL}/api/auth/me", headers=headers)
+            response = self.session.get(URL_ME, headers=headers)
             if response.status_code == 401:
-                print("✅ Invalid token correctly rejected")
+                out.append("✅ Invalid token correctly rejected")
             else:
-                print(f"❌ Invalid token not properly handled (status: {response.status_code})")
+                out.append(f"❌ Invalid token not properly handled (status: {response.status_code})")
         except Exception as e:
-            print(f"❌ Error testing invalid token: {e}")
+            out.append(f"❌ Error testing invalid token: {e}")
         
-        print("\n" + "=" * 80)
-        print("AUTHENTICATION SYSTEM TEST COMPLETED")
-        print("=" * 80)
+        out.append("\n" + "=" * 80)
+        out.append("AUTHENTICATION SYSTEM TEST COMPLETED")
+        out.append("=" * 80)
         
         # Summary
         successful_logins = sum(1 for result in login_results.values() if result["success"])
-        print(f"\n📊 SUMMARY:")
-        print(f"   - Users successfully logged in: {successful_logins}/{len(TEST_USERS)}")
-        print(f"   - JWT tokens generated: {len(self.tokens)}")
-        print(f"   - System ready for production use: {'✅ YES' if successful_logins == len(TEST_USERS) else '❌ NO'}")
+        out.append(f"\n📊 SUMMARY:")
+        out.append(f"   - Users successfully logged in: {successful_logins}/{len(TEST_USERS)}")
+        out.append(f"   - JWT tokens generated: {len(self.tokens)}")
+        out.append(f"   - System ready for production use: {'✅ YES' if successful_logins == len(TEST_USERS) else '❌ NO'}")
+        emit(out)
         
         return successful_logins == len(TEST_USERS)
 